@@ -0,0 +1,2315 @@
+import time
+_T_START = time.perf_counter()  # 启动计时起点，需在其他 import 之前
+import os
+import sys
+import json
+import threading
+
+# ==========================================
+# 全局配置与多语言界面词典
+# ==========================================
+APP_CONFIG_FILE = "ModManagerConfig.json"
+META_CACHE_FILE = "ModMetaCache.json"
+FILE_CACHE_FILE = "ModFileCache.json"  # 各模组完整文件列表，供冲突分析等使用
+HASH_CACHE_FILE = "ModHashCache.json"  # 各文件的内容摘要，按 size + mtime 校验
+HASH_CHUNK = 1 << 20            # 分块读取的块大小
+HASH_MMAP_MIN = 8 << 20         # 不小于此大小的文件用 mmap 读取
+DEFAULT_HASH_WORKERS = 4        # 计算摘要的进程数上限，可在 ModManagerConfig.json 的 hash_workers 中修改
+PRESET_DIR = "Presets"
+PRESET_INDEX_FILE = "PresetIndex.json"  # 预设索引，与其他缓存一样放在程序目录
+PRESET_LEGACY_INDEX = "_index.json"     # 旧版放在 Presets 文件夹内的索引，读取时删除
+PROFILE_DIR = "Profiles"   # 各配置方案的缓存文件夹 (default 方案的缓存仍在程序目录)
+DEFAULT_PROFILE = "default"
+LAST_ORDER_FILE = "LastLoadOrder.json"  # 每个配置方案上次读取/保存时的加载顺序
+DEFAULT_SCAN_WORKERS = 8   # 后台扫描线程数，可在 ModManagerConfig.json 的 scan_workers 中修改
+SCAN_POLL_MS = 50          # 主线程轮询扫描结果的间隔
+THUMB_DIR = "ThumbCache"
+THUMB_SIZE = (380, 300)    # 详情面板图片的最大宽高
+THUMB_DISK_MAX_FILES = 3000
+DEFAULT_THUMB_CACHE_MB = 32  # 内存中 PhotoImage 的上限，可在 ModManagerConfig.json 的 thumb_cache_mb 中修改
+THUMB_PREFETCH_RADIUS = 2  # 预读选中行上下各几行的图片
+DEFAULT_VIRTUAL_THRESHOLD = 2000  # 模组数超过此值时列表只创建可见行，可在 ModManagerConfig.json 的 virtual_threshold 中修改
+WATCH_INOTIFY_MS = 250     # inotify 事件的读取间隔
+WATCH_POLL_MS = 3000       # 无 inotify 时比较目录 mtime 的间隔
+WATCH_DEBOUNCE_MS = 1500   # 最后一个变化之后静默这么久才刷新，Steam 批量下载只触发一次
+DRAG_FRAME_MS = 16         # 拖拽时每帧最多处理一次指针移动
+DRAG_EDGE_PX = 32          # 距上下边缘多少像素内开始自动滚动
+DRAG_SCROLL_MS = 40        # 自动滚动的间隔
+DRAG_SCROLL_ACCEL = 8      # 在边缘停留每秒额外增加的滚动行数
+DRAG_SCROLL_MAX = 40       # 每次自动滚动的最大行数
+CONFIG_ENCODING = 'utf-8'  # usersettings.ini 的读写编码；非 UTF-8 字节以 surrogateescape 原样往返，BOM 保留
+CONFIG_ERRORS = 'surrogateescape'
+DEFAULT_BACKUP_COUNT = 10  # 保留的 usersettings.ini 时间戳备份份数，可在 ModManagerConfig.json 的 backup_count 中修改
+
+# 界面本身的语言文本
+UI_LANG_DATA = {
+    "cn": {
+        "title": "游戏模组管理器",
+        "path_settings": "路径设置",
+        "profile": "配置方案:",
+        "new_profile": "新建",
+        "del_profile": "删除",
+        "ask_profile_name": "新配置方案的名称 (路径与缓存先复制当前方案，之后可修改路径):",
+        "msg_profile_exists": "配置方案“{}”已存在。",
+        "msg_profile_delete": "删除配置方案“{}”及其缓存？(游戏文件不受影响)",
+        "msg_profile_unsaved": "当前加载顺序有未保存的改动，切换后将丢失。是否继续？",
+        "game_config": "游戏配置文件:",
+        "mod_dir": "模组保存目录:",
+        "browse": "浏览...",
+        "load_refresh": "读取/刷新",
+        "save_config": "保存配置 (自动备份)",
+        "save_preset": "保存预设",
+        "load_preset": "加载预设",
+        "font_size": "字体大小:",
+        "language": "语言/Language:",
+        "mod_list_title": "模组加载顺序 (拖拽排序，双击开关)",
+        "col_status": "状态",
+        "col_name": "模组名称",
+        "col_id": "ID/文件夹",
+        "col_size": "体积",
+        "size_totals": "已启用 {} / {} 个模组，共 {}，{} 个文件",
+        "size_pending": "已启用 {} / {} 个模组 (体积统计中...)",
+        "size_detail": "体积: {} ({} 个文件)",
+        "steam_detail": "创意工坊: {} 更新，安装体积 {}",
+        "steam_outdated": " (Steam 有可用更新)",
+        "asset_kinds": {"bundle": "资源包", "texture": "贴图", "model": "模型", "audio": "音频", "data": "配置/数据", "other": "其他"},
+        "mod_details": "模组详情",
+        "no_image": "无图片",
+        "status_on": "✅ 开启",
+        "status_off": "❌ 关闭",
+        "msg_error": "错误",
+        "msg_success": "成功",
+        "msg_confirm": "确认",
+        "msg_path_err": "路径无效，请检查设置。",
+        "cancel_scan": "取消扫描",
+        "scan_progress": "扫描中 {}/{}",
+        "msg_load_ok": "已加载 {} 个模组",
+        "msg_cache_stats": "\n缓存命中 {} 个，重新解析 {} 个，清理 {} 个",
+        "msg_load_issues": "\nusersettings.ini 中有 {} 处异常内容已跳过 (重复或格式错误的行，详见控制台输出)",
+        "msg_manifest_stats": "\nSteam 清单: {} 个模组自上次读取后已更新，{} 个有可用更新 (蓝色标出)",
+        "msg_scan_cancelled": "扫描已取消，已读取 {} / {} 个模组的信息。",
+        "msg_saved": "配置文件已保存！\n备份: {}",
+        "msg_unchanged": "加载顺序没有变化，未写入文件。",
+        "watch_changes": "自动刷新",
+        "msg_config_changed": "usersettings.ini 已被其他程序修改。\n重新读取会丢弃当前未保存的改动，是否重新读取？",
+        "msg_backup_fail": "备份失败: {}\n是否继续保存？",
+        "msg_preset_saved": "预设已保存。",
+        "msg_preset_loaded": "预设加载完成。",
+        "msg_preset_missing": "\n\n注意：以下模组在预设中存在但本地未安装：\n",
+        "fallback_desc": "该模组无当前语言的简介。",
+        "search": "搜索:",
+        "filter_states": ["全部", "已启用", "已禁用"],
+        "menu_enable": "启用所选",
+        "menu_disable": "禁用所选",
+        "menu_top": "移到顶部",
+        "menu_bottom": "移到底部",
+        "menu_refresh_sizes": "重新统计所选体积",
+        "preset_browse": "其他文件...",
+        "preset_apply": "应用",
+        "preset_apply_save": "应用并保存",
+        "cancel": "取消",
+        "preset_summary": "移动 {} 个，启用 {} 个，禁用 {} 个，本地缺失 {} 个",
+        "preset_nochange": "当前加载顺序与该预设一致。",
+        "preset_sections": ["启用", "禁用", "移动", "本地缺失"],
+        "preset_more": "  …… 另有 {} 个",
+        "check_conflicts": "冲突分析",
+        "close": "关闭",
+        "conflict_running": "分析中...",
+        "conflict_summary": "共 {} 个文件，其中 {} 个被多个模组同时提供。",
+        "conflict_none": "没有发现多个模组提供同一文件。",
+        "conflict_overrides": "文件覆盖 (后加载的生效):",
+        "conflict_override_line": "  {} 覆盖 {}：{} 个文件 (如 {})",
+        "conflict_order": "未满足的加载顺序提示:",
+        "conflict_order_line": "  {} 应在 {} 之后加载",
+        "conflict_missing": "缺少依赖:",
+        "conflict_missing_line": "  {} 需要 {} (未安装或未启用)",
+        "conflict_cycles": "互相矛盾的顺序提示 (已忽略):",
+        "conflict_sort": "按依赖提示排序需要移动 {} 个模组。",
+        "conflict_sorted": "当前顺序已满足所有依赖提示。",
+        "conflict_apply": "应用建议顺序",
+        "check_dups": "查找重复",
+        "dup_running": "查重中...",
+        "dup_summary": "检查了 {} 个模组 (本次读取 {} 个文件，其余使用缓存)。",
+        "dup_result": "\n内容完全相同: {} 组\n文件全部包含在其他模组中: {} 个\n已在列表中以橙色标出。",
+        "dup_none": "\n没有发现重复的模组。",
+        "dup_same": "⚠ 与以下模组内容完全相同: {}",
+        "dup_contained": "⚠ 全部文件都包含在 {} 中",
+        "trace_idle": "调试跟踪已开启，等待操作...",
+        "trace_dump": "导出跟踪",
+        "msg_trace_saved": "跟踪已保存 (可在 chrome://tracing 或 ui.perfetto.dev 中打开):\n{}"
+    },
+    "en": {
+        "title": "Game Mod Manager",
+        "path_settings": "Path Settings",
+        "profile": "Profile:",
+        "new_profile": "New",
+        "del_profile": "Delete",
+        "ask_profile_name": "Name of the new profile (paths and caches are copied from the current profile; change the paths afterwards):",
+        "msg_profile_exists": "Profile \"{}\" already exists.",
+        "msg_profile_delete": "Delete profile \"{}\" and its caches? (Game files are not touched.)",
+        "msg_profile_unsaved": "The current load order has unsaved changes that will be lost. Switch anyway?",
+        "game_config": "Game Config File:",
+        "mod_dir": "Mod Directory:",
+        "browse": "Browse...",
+        "load_refresh": "Load/Refresh",
+        "save_config": "Save Config (Auto Backup)",
+        "save_preset": "Save Preset",
+        "load_preset": "Load Preset",
+        "font_size": "Font Size:",
+        "language": "Language:",
+        "mod_list_title": "Load Order (Drag to reorder, Double-click to toggle)",
+        "col_status": "Status",
+        "col_name": "Mod Name",
+        "col_id": "ID/Folder",
+        "col_size": "Size",
+        "size_totals": "Enabled {} / {} mods, {} in {} files",
+        "size_pending": "Enabled {} / {} mods (measuring sizes...)",
+        "size_detail": "Size: {} ({} files)",
+        "steam_detail": "Workshop: updated {}, installed size {}",
+        "steam_outdated": " (update available on Steam)",
+        "asset_kinds": {"bundle": "Bundles", "texture": "Textures", "model": "Models", "audio": "Audio", "data": "Config/Data", "other": "Other"},
+        "mod_details": "Details",
+        "no_image": "No Image",
+        "status_on": "✅ ON",
+        "status_off": "❌ OFF",
+        "msg_error": "Error",
+        "msg_success": "Success",
+        "msg_confirm": "Confirm",
+        "msg_path_err": "Invalid paths. Please check settings.",
+        "cancel_scan": "Cancel Scan",
+        "scan_progress": "Scanning {}/{}",
+        "msg_load_ok": "Loaded {} mods.",
+        "msg_cache_stats": "\nCache hits: {}, re-parsed: {}, evicted: {}",
+        "msg_load_issues": "\nSkipped {} problem(s) in usersettings.ini (duplicate or malformed lines, see console output)",
+        "msg_manifest_stats": "\nSteam manifest: {} mod(s) updated since the last load, {} with updates available (shown in blue)",
+        "msg_scan_cancelled": "Scan cancelled. Info read for {} / {} mods.",
+        "msg_saved": "Configuration saved!\nBackup: {}",
+        "msg_unchanged": "Load order unchanged, nothing written.",
+        "watch_changes": "Auto refresh",
+        "msg_config_changed": "usersettings.ini was modified by another program.\nReloading discards your unsaved changes. Reload now?",
+        "msg_backup_fail": "Backup failed: {}\nContinue saving?",
+        "msg_preset_saved": "Preset saved.",
+        "msg_preset_loaded": "Preset loaded.",
+        "msg_preset_missing": "\n\nWarning: The following mods are in preset but missing locally:\n",
+        "fallback_desc": "No description available for this language.",
+        "search": "Search:",
+        "filter_states": ["All", "Enabled", "Disabled"],
+        "menu_enable": "Enable Selected",
+        "menu_disable": "Disable Selected",
+        "menu_top": "Move to Top",
+        "menu_bottom": "Move to Bottom",
+        "menu_refresh_sizes": "Re-measure Selected Sizes",
+        "preset_browse": "Other File...",
+        "preset_apply": "Apply",
+        "preset_apply_save": "Apply and Save",
+        "cancel": "Cancel",
+        "preset_summary": "Move {}, enable {}, disable {}, missing locally {}",
+        "preset_nochange": "The current load order already matches this preset.",
+        "preset_sections": ["Enable", "Disable", "Move", "Missing locally"],
+        "preset_more": "  ... and {} more",
+        "check_conflicts": "Conflicts",
+        "close": "Close",
+        "conflict_running": "Analyzing...",
+        "conflict_summary": "{} files in total, {} of them provided by more than one mod.",
+        "conflict_none": "No file is provided by more than one mod.",
+        "conflict_overrides": "File overrides (the later mod wins):",
+        "conflict_override_line": "  {} overrides {}: {} files (e.g. {})",
+        "conflict_order": "Unmet load order hints:",
+        "conflict_order_line": "  {} should load after {}",
+        "conflict_missing": "Missing dependencies:",
+        "conflict_missing_line": "  {} requires {} (not installed or disabled)",
+        "conflict_cycles": "Contradicting order hints (ignored):",
+        "conflict_sort": "Sorting by the dependency hints moves {} mods.",
+        "conflict_sorted": "The current order satisfies all dependency hints.",
+        "conflict_apply": "Apply Suggested Order",
+        "check_dups": "Duplicates",
+        "dup_running": "Hashing...",
+        "dup_summary": "Checked {} mods ({} files read this time, the rest from cache).",
+        "dup_result": "\nIdentical content: {} groups\nAll files contained in another mod: {} mods\nThey are highlighted in orange in the list.",
+        "dup_none": "\nNo duplicate mods found.",
+        "dup_same": "⚠ Same content as: {}",
+        "dup_contained": "⚠ All files are also in {}",
+        "trace_idle": "Tracing enabled, waiting for an operation...",
+        "trace_dump": "Dump Trace",
+        "msg_trace_saved": "Trace saved (open it in chrome://tracing or ui.perfetto.dev):\n{}"
+    }
+}
+
+def get_app_path():
+    """获取程序运行目录 (兼容 exe)"""
+    if getattr(sys, 'frozen', False):
+        return os.path.dirname(sys.executable)
+    return os.path.dirname(os.path.abspath(__file__))
+
+# ==========================================
+# 启动计时 (--profile-startup)
+# ==========================================
+class StartupProfile:
+    """记录启动各阶段 (import、建界面、首帧、加载数据) 的耗时，--profile-startup 时打印"""
+    def __init__(self, t0):
+        self.enabled = False
+        self.t0 = t0
+        self._last = t0
+        self.phases = []   # (阶段名, 耗时秒)
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    def timed(self, name):
+        """包住某一段代码单独计时 (如延迟导入的 PIL)，不影响前后阶段的划分"""
+        profile = self
+
+        class _Timer:
+            def __enter__(self):
+                self.t = time.perf_counter()
+
+            def __exit__(self, *exc):
+                dt = time.perf_counter() - self.t
+                profile.phases.append((name, dt))
+                profile._last += dt
+        return _Timer()
+
+    def report(self):
+        if not self.enabled:
+            return
+        total = time.perf_counter() - self.t0
+        print("Startup profile (ms):")
+        for name, dt in self.phases:
+            print(f"  {name:<28} {dt * 1000:>8.1f}")
+        print(f"  {'total':<28} {total * 1000:>8.1f}")
+        self.enabled = False
+
+STARTUP = StartupProfile(_T_START)
+
+# ==========================================
+# 运行时计时与计数 (--trace)
+# ==========================================
+TRACE_MAX_EVENTS = 200000  # 内存中保留的 Chrome trace 事件数上限 (超出后丢弃最早的)
+TRACE_STATUS_SPANS = 4     # 调试状态栏显示耗时最多的几个区段
+
+class _NullSpan:
+    """未开启跟踪时 span() 返回的共享空对象"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class TraceOp:
+    """一次顶层操作 (读取、刷新列表、显示详情、保存) 的分解：各区段累计耗时与计数器增量"""
+    def __init__(self, name):
+        self.name = name
+        self.t0 = time.perf_counter()
+        self.elapsed = 0.0
+        self.spans = {}   # 区段名 -> [调用次数, 累计秒]；后台线程并行时累计值可超过总耗时
+        self.counts = {}
+
+class Tracer:
+    """
+    热点路径的计时与计数，--trace 时开启；未开启时 span() 只多一次属性判断。
+    - op / start_op + finish_op：顶层操作，期间任意线程结束的区段与计数都计入该操作
+    - span：计时区段，同时记录为 Chrome trace 的 "X" 事件
+    - count：计数器 (stat / scandir / open / 图片解码)
+    - dump：写出可用 chrome://tracing 或 Perfetto 打开的 JSON
+    """
+    def __init__(self, t0):
+        self.enabled = False
+        self.t0 = t0
+        self.current = None     # 进行中的 TraceOp
+        self.last = None        # 最近完成的 TraceOp
+        self.listener = None    # 操作完成时在主线程调用 listener(op)
+        self.totals = {}        # 整个会话的计数器
+        self._events = None
+        self._threads = {}
+        self._lock = threading.Lock()
+
+    def enable(self):
+        from collections import deque
+        self.enabled = True
+        self._events = deque(maxlen=TRACE_MAX_EVENTS)
+
+    def span(self, name):
+        return _Span(self, name) if self.enabled else _NULL_SPAN
+
+    def op(self, name):
+        """同步操作；已有操作进行中时 (如读取结束时的刷新列表) 只作为其中一个区段"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name) if self.current is not None else _OpSpan(self, name)
+
+    def wrap(self, name, op=False):
+        """装饰器形式的 span / op"""
+        def deco(fn):
+            import functools
+
+            @functools.wraps(fn)
+            def wrapper(*a, **kw):
+                if not self.enabled:
+                    return fn(*a, **kw)
+                with (self.op(name) if op else _Span(self, name)):
+                    return fn(*a, **kw)
+            return wrapper
+        return deco
+
+    def start_op(self, name):
+        """跨越多次事件循环的操作 (如后台扫描)，由 finish_op 结束"""
+        if self.enabled:
+            self.current = TraceOp(name)
+
+    def finish_op(self):
+        op = self.current
+        if op is None:
+            return
+        self.current = None
+        now = time.perf_counter()
+        op.elapsed = now - op.t0
+        self._record(op.name, op.t0, now, "op", op.counts)
+        self.last = op
+        if self.listener is not None:
+            self.listener(op)
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.totals[name] = self.totals.get(name, 0) + n
+            op = self.current
+            if op is not None:
+                op.counts[name] = op.counts.get(name, 0) + n
+
+    def _end_span(self, name, t0, t1):
+        with self._lock:
+            op = self.current
+            if op is not None:
+                s = op.spans.get(name)
+                if s is None:
+                    op.spans[name] = [1, t1 - t0]
+                else:
+                    s[0] += 1
+                    s[1] += t1 - t0
+        self._record(name, t0, t1, "span")
+
+    def _record(self, name, t0, t1, cat, args=None):
+        t = threading.current_thread()
+        self._threads.setdefault(t.ident, t.name)
+        ev = {"name": name, "cat": cat, "ph": "X", "pid": os.getpid(), "tid": t.ident,
+              "ts": round((t0 - self.t0) * 1e6, 1), "dur": round((t1 - t0) * 1e6, 1)}
+        if args:
+            ev["args"] = dict(args)
+        self._events.append(ev)
+
+    def dump(self, path):
+        """写出 Chrome trace JSON，返回写入的事件数"""
+        pid = os.getpid()
+        with self._lock:
+            events = list(self._events or ())
+            threads = dict(self._threads)
+            totals = dict(self.totals)
+        meta = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                for tid, name in threads.items()]
+        d = {"traceEvents": meta + events, "displayTimeUnit": "ms", "otherData": {"counters": totals}}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(d, f, separators=(',', ':'))
+        return len(events)
+
+class _Span:
+    __slots__ = ('tracer', 'name', 't0')
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer._end_span(self.name, self.t0, time.perf_counter())
+        return False
+
+class _OpSpan:
+    __slots__ = ('tracer', 'name')
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.tracer.start_op(self.name)
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.finish_op()
+        return False
+
+TRACE = Tracer(_T_START)
+
+# ==========================================
+# 创意工坊目录索引 (单次 scandir)
+# ==========================================
+IMAGE_EXTS = ('.jpg', '.jpeg', '.png')
+
+class ModDirIndex:
+    """
+    一次 os.scandir 得到的单个模组文件夹信息。
+    stat 结果取自 os.DirEntry，按需获取 (Windows 上随目录枚举免费得到，Linux 上才需要一次 stat)。
+    """
+    __slots__ = ('path', 'dir_entry', 'images', 'info_file', 'info_entry')
+
+    def __init__(self, path, dir_entry=None):
+        self.path = path
+        self.dir_entry = dir_entry
+        self.images = []       # 图片文件名 (保持目录枚举顺序)
+        self.info_file = None  # _info.ini，或兼容旧版的 _info*.txt
+        self.info_entry = None
+
+    @property
+    def dir_stat(self):
+        TRACE.count("stat")
+        return self.dir_entry.stat() if self.dir_entry is not None else os.stat(self.path)
+
+    @property
+    def info_stat(self):
+        if self.info_entry is None:
+            return None
+        TRACE.count("stat")
+        return self.info_entry.stat()
+
+def index_workshop(workshop_root_path):
+    """扫描创意工坊根目录一次，返回 {文件夹名: os.DirEntry}"""
+    result = {}
+    TRACE.count("scandir")
+    with os.scandir(workshop_root_path) as it:
+        for e in it:
+            try:
+                if e.is_dir():
+                    result[e.name] = e
+            except OSError:
+                pass
+    return result
+
+def scan_mod_dir(mod_dir, dir_entry=None):
+    """
+    单次 os.scandir 遍历模组文件夹，同时收集图片候选与信息文件。
+    信息文件优先 _info.ini，其次第一个 _info*.txt (与旧逻辑一致)。
+    """
+    idx = ModDirIndex(mod_dir, dir_entry)
+    txt_entry = None
+    TRACE.count("scandir")
+    with os.scandir(mod_dir) as it:
+        for e in it:
+            name = e.name
+            lower = name.lower()
+            if lower.endswith(IMAGE_EXTS):
+                idx.images.append(name)
+            elif lower == "_info.ini":
+                idx.info_entry = e
+            elif txt_entry is None and name.startswith("_info") and name.endswith(".txt"):
+                txt_entry = e
+
+    if idx.info_entry is None:
+        idx.info_entry = txt_entry
+    if idx.info_entry is not None:
+        idx.info_file = idx.info_entry.name
+    return idx
+
+# ==========================================
+# Steam 创意工坊清单 (appworkshop_<appid>.acf)
+# ==========================================
+WORKSHOP_APP_ID = "1286220"
+MANIFEST_TITLE_LANG = "steam"  # 清单中的标题作为名字的一种"语言"，仅在没有信息文件名字时使用
+
+def manifest_path(workshop_root_path):
+    """.../steamapps/workshop/content/<appid> -> .../steamapps/workshop/appworkshop_<appid>.acf"""
+    root = os.path.normpath(os.path.abspath(workshop_root_path))
+    app_id = os.path.basename(root)
+    if not app_id.isdigit():
+        app_id = WORKSHOP_APP_ID
+    return os.path.join(os.path.dirname(os.path.dirname(root)), f"appworkshop_{app_id}.acf")
+
+_VDF_ESCAPES = {'n': '\n', 't': '\t', '"': '"', '\\': '\\'}
+
+def _vdf_unescape(tok):
+    out = []
+    it = iter(tok)
+    for c in it:
+        if c == '\\':
+            c = next(it, '')
+            c = _VDF_ESCAPES.get(c, '\\' + c)
+        out.append(c)
+    return ''.join(out)
+
+def parse_vdf(f):
+    """
+    逐行解析 Valve KeyValues (VDF/ACF) 文本，返回嵌套 dict，键统一小写。
+    支持带引号与不带引号的记号、反斜杠转义与 // 注释；多余的 } 与不完整的行直接忽略。
+    """
+    root = {}
+    stack = [root]
+    key = None
+    for line in f:
+        i, n = 0, len(line)
+        while i < n:
+            c = line[i]
+            if c in ' \t\r\n':
+                i += 1
+                continue
+            if c == '/' and line.startswith('//', i):
+                break
+            if c == '{':
+                i += 1
+                if key is not None:
+                    child = {}
+                    stack[-1][key] = child
+                    stack.append(child)
+                    key = None
+                continue
+            if c == '}':
+                i += 1
+                key = None
+                if len(stack) > 1:
+                    stack.pop()
+                continue
+            if c == '"':
+                j = i + 1
+                while j < n and line[j] != '"':
+                    j += 2 if line[j] == '\\' else 1
+                tok = line[i + 1:min(j, n)]
+                if '\\' in tok:
+                    tok = _vdf_unescape(tok)
+                i = j + 1
+            else:
+                j = i
+                while j < n and line[j] not in ' \t\r\n{}"':
+                    j += 1
+                tok = line[i:j]
+                i = j
+            if key is None:
+                key = tok.lower()
+            else:
+                stack[-1][key] = tok
+                key = None
+    return root
+
+def _vdf_int(d, name):
+    try:
+        return int(d.get(name, 0))
+    except (TypeError, ValueError):
+        return 0
+
+class WorkshopItem:
+    """清单中的单个创意工坊物品：安装体积、已安装版本与最新版本的更新时间，以及标题 (如有)"""
+    __slots__ = ('size', 'updated', 'latest', 'title')
+
+    def __init__(self, size=0, updated=0, latest=0, title=None):
+        self.size = size
+        self.updated = updated
+        self.latest = latest
+        self.title = title
+
+    @property
+    def outdated(self):
+        """Steam 已知有更新但本地尚未下载"""
+        return self.latest > self.updated
+
+class WorkshopManifest:
+    """
+    appworkshop_<appid>.acf 的索引 {物品 ID: WorkshopItem}。
+    以文件 mtime+size 作为签名，read_manifest 在签名未变时直接复用上次的结果。
+    """
+    def __init__(self, path, sig, items):
+        self.path = path
+        self.sig = sig
+        self.items = items
+
+    def get(self, mod_id):
+        return self.items.get(mod_id)
+
+    def time_updated(self, mod_id):
+        item = self.items.get(mod_id)
+        return item.updated if item is not None else 0
+
+    def title(self, mod_id):
+        item = self.items.get(mod_id)
+        return item.title if item is not None else None
+
+def read_manifest(path, previous=None):
+    """读取并索引清单文件；文件不存在或无法读取时返回 None，签名未变时返回 previous"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    sig = (st.st_mtime_ns, st.st_size)
+    if previous is not None and previous.path == path and previous.sig == sig:
+        return previous
+    TRACE.count("open")
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            data = parse_vdf(f)
+    except OSError as e:
+        print(f"Workshop manifest ignored: {e}")
+        return None
+    top = data.get("appworkshop")
+    if not isinstance(top, dict):
+        top = {}
+    installed = top.get("workshopitemsinstalled")
+    details = top.get("workshopitemdetails")
+    installed = installed if isinstance(installed, dict) else {}
+    details = details if isinstance(details, dict) else {}
+
+    items = {}
+    for mid in installed.keys() | details.keys():
+        a = installed.get(mid)
+        b = details.get(mid)
+        a = a if isinstance(a, dict) else {}
+        b = b if isinstance(b, dict) else {}
+        updated = _vdf_int(a, "timeupdated") or _vdf_int(b, "timeupdated")
+        latest = _vdf_int(b, "latest_timeupdated") or updated
+        title = a.get("title") or b.get("title")
+        items[mid] = WorkshopItem(_vdf_int(a, "size"), updated, latest,
+                                  title if isinstance(title, str) and title else None)
+    return WorkshopManifest(path, sig, items)
+
+# ==========================================
+# 核心数据类 (核心修改部分)
+# ==========================================
+
+INFO_NAME_KEY = 'Name='
+INFO_DESC_KEY = 'Description='
+INFO_LANG_PREFIX = '[language_'
+
+def parse_info_file(file_path, key=INFO_NAME_KEY, langs=None):
+    """
+    逐行流式解析 _info.ini / _info*.txt，返回 {语言代码: 值}。
+    - 识别任意 [Language_xx] 区块，语言代码为小写的 xx (cn/en/ru...)
+    - 只为 key 指定的字段 (Name= 或 Description=) 分配字符串，其余行只做前缀判断
+    - 给定 langs 时，这些语言的字段都找到后立即停止读取
+    """
+    result = {}
+    remaining = set(langs) if langs else None
+    cur = None
+    klen = len(key)
+    TRACE.count("open")
+    with open(file_path, 'r', encoding='utf-8-sig', errors='ignore') as f:
+        for line in f:
+            stripped = line.lstrip()  # 无前导空白时返回原对象，不产生新字符串
+            if stripped[:1] == '[':
+                head = stripped.rstrip().lower()
+                if head.startswith(INFO_LANG_PREFIX):
+                    end = head.find(']')
+                    cur = sys.intern(head[len(INFO_LANG_PREFIX):end]) if end > len(INFO_LANG_PREFIX) else None
+                elif head.endswith(']'):
+                    cur = None  # 其他无关区块
+                continue
+            if cur is None or cur in result or (remaining is not None and cur not in remaining):
+                continue
+            if stripped.startswith(key):
+                result[cur] = stripped[klen:].strip()
+                if remaining is not None:
+                    remaining.discard(cur)
+                    if not remaining:
+                        break
+    return result
+
+class DescriptionStore:
+    """
+    模组描述的外置存储：按信息文件路径缓存最近读取过的描述 (LRU)，
+    不随 ModItem 常驻内存，需要时再从文件读取。
+    """
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self._items = {}   # info_path -> {语言代码: 描述}，dict 保持插入顺序，用作 LRU
+        self._lock = threading.Lock()
+
+    def get(self, info_path, langs):
+        """返回 langs 中第一个非空的描述，只读取尚未缓存的语言，找到即停止"""
+        with self._lock:
+            descs = self._items.pop(info_path, None)
+            if descs is None:
+                descs = {}
+            self._items[info_path] = descs
+            while len(self._items) > self.capacity:
+                del self._items[next(iter(self._items))]
+        todo = [l for l in langs if l not in descs]
+        if todo:
+            try:
+                found = parse_info_file(info_path, INFO_DESC_KEY, todo)
+            except OSError as e:
+                print(f"Parsing error {info_path}: {e}")
+                found = {}
+            for l in todo:
+                descs[l] = found.get(l, '')
+        for l in langs:
+            if descs.get(l):
+                return descs[l]
+        return ''
+
+    def forget(self, info_path):
+        with self._lock:
+            self._items.pop(info_path, None)
+
+DESC_STORE = DescriptionStore()
+
+class ModItem:
+    """
+    单个模组。使用 __slots__ 去掉实例 __dict__；名字以扁平元组
+    (语言, 名字, 语言, 名字, ...) 保存且语言代码已 intern，描述存放在 DESC_STORE。
+    """
+    __slots__ = ('mod_id', 'enabled', 'image_path', 'info_path', 'names')
+
+    def __init__(self, mod_id, enabled=False):
+        self.mod_id = mod_id
+        self.enabled = enabled
+        self.image_path = None
+        self.info_path = None
+        self.names = ()
+
+    def clear_info(self):
+        """清空已读取的图片与名字 (文件夹变化后重新 load_info 之前调用)"""
+        if self.info_path:
+            DESC_STORE.forget(self.info_path)
+        self.image_path = None
+        self.info_path = None
+        self.names = ()
+
+    @TRACE.wrap("load_info")
+    def load_info(self, workshop_root_path, cache=None, root_index=None, manifest=None):
+        """
+        读取图片与信息文件。root_index 为 index_workshop 的结果，
+        提供时直接据此判断文件夹是否存在，不再逐个 stat。
+        manifest 为 Steam 创意工坊清单：清单中的更新时间与缓存一致时不访问文件夹；
+        没有信息文件名字时用清单中的标题。
+        """
+        mod_dir = os.path.join(workshop_root_path, self.mod_id)
+        dir_entry = None
+        if root_index is not None:
+            dir_entry = root_index.get(self.mod_id)
+            if dir_entry is None:
+                return
+        ws_time = manifest.time_updated(self.mod_id) if manifest is not None else 0
+
+        try:
+            # 0. 缓存命中则直接复用：清单时间一致时无需 stat，否则比较文件夹与信息文件的 stat
+            if cache is not None:
+                if ws_time and cache.lookup_manifest(self, mod_dir, ws_time):
+                    return
+                TRACE.count("stat")
+                dir_stat = dir_entry.stat() if dir_entry is not None else os.stat(mod_dir)
+                if cache.lookup(self, mod_dir, dir_stat, ws_time):
+                    return
+
+            # 1. 单次 scandir 收集图片与信息文件
+            entry = scan_mod_dir(mod_dir, dir_entry)
+        except OSError:
+            return
+        self.apply_dir_index(entry)
+        if not self.names and manifest is not None:
+            title = manifest.title(self.mod_id)
+            if title:
+                self.set_names({MANIFEST_TITLE_LANG: title})
+
+        if cache is not None:
+            try:
+                cache.store(self, entry, ws_time)
+            except OSError:
+                pass
+
+    def apply_dir_index(self, entry):
+        """根据 ModDirIndex 设置图片并解析信息文件 (覆盖先前由缓存填入的内容)"""
+        self.image_path = os.path.join(entry.path, entry.images[0]) if entry.images else None
+        if entry.info_file:
+            self._parse_info(os.path.join(entry.path, entry.info_file))
+        else:
+            self.info_path = None
+            self.names = ()
+
+    @TRACE.wrap("_parse_info")
+    def _parse_info(self, file_path):
+        """只解析各语言的名字，描述留到 get_desc 时再读"""
+        self.info_path = file_path
+        DESC_STORE.forget(file_path)
+        try:
+            self.set_names(parse_info_file(file_path, INFO_NAME_KEY))
+        except Exception as e:
+            print(f"Parsing error {self.mod_id}: {e}")
+
+    def set_names(self, names):
+        """{语言代码: 名字} -> 扁平元组"""
+        flat = []
+        for lang, name in names.items():
+            flat.append(sys.intern(lang))
+            flat.append(name)
+        self.names = tuple(flat)
+
+    def names_dict(self):
+        n = self.names
+        return dict(zip(n[::2], n[1::2]))
+
+    @staticmethod
+    def _lang_order(lang_code):
+        """当前语言优先，其次中/英文互为回退"""
+        return (lang_code, 'en' if lang_code == 'cn' else 'cn')
+
+    def get_display_name(self, lang_code):
+        """返回对应语言的名字，依次回退到另一种语言、任意语言、模组 ID"""
+        # 单次遍历扁平元组：命中当前语言立即返回，否则记下回退语言 (或任意语言) 的名字
+        it = iter(self.names)
+        fallback = 'en' if lang_code == 'cn' else 'cn'
+        other = None
+        for lang, name in zip(it, it):
+            if name:
+                if lang == lang_code:
+                    return name
+                if other is None or lang == fallback:
+                    other = name
+        return other or self.mod_id # 都没有则显示ID
+
+    def get_desc(self, lang_code):
+        """按需读取描述：只找当前语言与回退语言，找到即停止读取文件"""
+        if not self.info_path:
+            return ''
+        return DESC_STORE.get(self.info_path, self._lang_order(lang_code))
+
+    def get_display_info(self, lang_code):
+        """
+        根据传入的语言代码 (cn/en) 返回 (name, desc)。
+        如果对应语言为空，则回退到另一种语言，防止空白。
+        描述可能需要读文件，只取名字时请用 get_display_name。
+        """
+        return self.get_display_name(lang_code), self.get_desc(lang_code)
+
+# ==========================================
+# 模组列表模型
+# ==========================================
+class ModListModel:
+    """
+    加载顺序的唯一数据源：mod_id -> ModItem 映射 + 顺序数组 + mod_id -> 序号索引。
+    Treeview 以 mod_id 作为行 iid 镜像此模型，所有查找均为 O(1)。
+    """
+    def __init__(self, mods=()):
+        self.set_mods(mods)
+
+    def set_mods(self, mods):
+        """整体替换列表，重复的 mod_id 只保留第一次出现，返回被忽略的重复 ID"""
+        self.mods = {}
+        self.order = []
+        dups = []
+        for m in mods:
+            if m.mod_id in self.mods:
+                dups.append(m.mod_id)
+                continue
+            self.mods[m.mod_id] = m
+            self.order.append(m.mod_id)
+        self._pos = {}
+        self._reindex(0, len(self.order))
+        return dups
+
+    def _reindex(self, start, end):
+        order = self.order
+        pos = self._pos
+        for i in range(start, end):
+            pos[order[i]] = i
+
+    def __len__(self):
+        return len(self.order)
+
+    def __iter__(self):
+        mods = self.mods
+        return (mods[mid] for mid in self.order)
+
+    def __contains__(self, mod_id):
+        return mod_id in self.mods
+
+    def get(self, mod_id):
+        return self.mods.get(mod_id)
+
+    def index(self, mod_id):
+        return self._pos[mod_id]
+
+    def at(self, idx):
+        return self.mods[self.order[idx]]
+
+    def slice(self, start, end):
+        mods = self.mods
+        return [mods[mid] for mid in self.order[start:end]]
+
+    def move(self, mod_id, dst_index):
+        """把 mod_id 移到 dst_index (与 Treeview.move 的序号语义一致)"""
+        src = self._pos[mod_id]
+        dst = max(0, min(dst_index, len(self.order) - 1))
+        if src == dst:
+            return
+        self.order.insert(dst, self.order.pop(src))
+        self._reindex(min(src, dst), max(src, dst) + 1)
+
+    def move_block(self, mod_ids, dst_index):
+        """
+        把 mod_ids 按当前相对顺序合成连续一段，插入到其余模组中第 dst_index 个之前
+        (0 为顶部，len - 块长度 为底部)，一次重建顺序。返回是否有变化。
+        """
+        block_set = set(mod_ids)
+        block = [mid for mid in self.order if mid in block_set]
+        rest = [mid for mid in self.order if mid not in block_set]
+        dst = max(0, min(dst_index, len(rest)))
+        return self.set_order(rest[:dst] + block + rest[dst:])
+
+    def set_order(self, order):
+        """替换为同一组模组的新顺序，只重建变化区间的索引。返回是否有变化"""
+        old = self.order
+        if len(order) != len(old) or set(order) != self.mods.keys():
+            raise ValueError("order must be a permutation of the current mods")
+        first = next((i for i, (a, b) in enumerate(zip(old, order)) if a != b), None)
+        if first is None:
+            return False
+        last = len(order) - next(i for i, (a, b) in enumerate(zip(reversed(old), reversed(order))) if a != b)
+        self.order = list(order)
+        self._reindex(first, last)
+        return True
+
+    def toggle(self, mod_id):
+        m = self.mods[mod_id]
+        m.enabled = not m.enabled
+        return m
+
+    def set_enabled(self, mod_ids, enabled):
+        """批量启用/禁用，返回状态实际改变的 ModItem 列表"""
+        changed = []
+        for mid in mod_ids:
+            m = self.mods[mid]
+            if m.enabled != enabled:
+                m.enabled = enabled
+                changed.append(m)
+        return changed
+
+class ModListView:
+    """ModListModel 的只读子集 (搜索/状态筛选的结果)，读取接口与模型一致"""
+    def __init__(self, mods):
+        self._mods = mods
+        self.order = [m.mod_id for m in mods]
+        self._pos = {mid: i for i, mid in enumerate(self.order)}
+
+    def __len__(self):
+        return len(self._mods)
+
+    def __iter__(self):
+        return iter(self._mods)
+
+    def __contains__(self, mod_id):
+        return mod_id in self._pos
+
+    def index(self, mod_id):
+        return self._pos[mod_id]
+
+    def at(self, idx):
+        return self._mods[idx]
+
+    def slice(self, start, end):
+        return self._mods[start:end]
+
+# ==========================================
+# usersettings.ini 加载顺序与预设读写 (GUI 与命令行共用)
+# ==========================================
+def parse_load_order(lines):
+    """
+    流式读取 [LoadOrder] 区块，不解析其他区块的内容 (只判断是否为区块标题)。
+    返回 (entries, issues)：entries 为按 N 排序的 [(N, mod_id, enabled)]，文件中没有该区块时为 None；
+    issues 为 [(行号, 说明)]。容错规则 (configparser 遇到这些情况会直接报错)：
+    - 重复的 [LoadOrder] 区块只认第一个 (与保存时 render_load_order 改写的区块一致)
+    - 同一个 N 出现多次时保留第一次
+    - 缺少分隔符、值中没有 ",true/false" 的行跳过
+    - 文件开头的 BOM 不影响区块标题的识别
+    """
+    entries = None
+    issues = []
+    seen = set()
+    declared = None
+    state = 0   # 0 区块之前 / 1 区块内 / 2 区块之后
+    for no, line in enumerate(lines, 1):
+        body = line.strip().lstrip('\ufeff')
+        if body[:1] == '[':
+            if body == '[LoadOrder]':
+                if state == 0:
+                    entries = []
+                    state = 1
+                    continue
+                issues.append((no, "duplicate [LoadOrder] section ignored"))
+            if state == 1:
+                state = 2
+            continue
+        if state != 1 or not body or body[0] in '#;':
+            continue
+
+        eq, colon = body.find('='), body.find(':')
+        cut = min(i for i in (eq, colon) if i > 0) if eq > 0 or colon > 0 else -1
+        if cut < 0:
+            issues.append((no, f"malformed line: {body[:60]}"))
+            continue
+        key = body[:cut].rstrip().lower()
+        val = body[cut + 1:].strip()
+        if key == 'numberofmodfiles':
+            declared = val
+            continue
+        num = key[3:-9]
+        if not (key.startswith('mod') and key.endswith('directory') and num.isascii() and num.isdigit()):
+            continue
+        n = int(num)
+        mid, sep, flag = val.partition(',')
+        mid = mid.strip()
+        if not sep or not mid:
+            issues.append((no, f"malformed mod entry: {body[:60]}"))
+            continue
+        if n in seen:
+            issues.append((no, f"duplicate Mod{n}Directory ignored"))
+            continue
+        seen.add(n)
+        entries.append((n, mid, flag.strip().lower() == 'true'))
+
+    if entries is not None:
+        entries.sort(key=lambda e: e[0])
+        if declared is not None and declared != str(len(entries)):
+            issues.append((0, f"NumberOfModFiles = {declared}, found {len(entries)} mod entries"))
+    return entries, issues
+
+@TRACE.wrap("read_load_order")
+def read_load_order(config_path, issues=None):
+    """
+    读取游戏配置文件，返回按 Mod{N}Directory 的 N 排序的 [ModItem...]。
+    文件中没有 [LoadOrder] 区块时返回 None。跳过的异常行追加到 issues，未提供时打印出来。
+    """
+    TRACE.count("open")
+    with open(config_path, 'r', encoding=CONFIG_ENCODING, errors=CONFIG_ERRORS) as f:
+        entries, found = parse_load_order(f)
+    if issues is None:
+        for no, text in found:
+            print(f"{os.path.basename(config_path)}:{no}: {text}")
+    else:
+        issues.extend(found)
+    if entries is None:
+        return None
+    return [ModItem(mid, en) for _, mid, en in entries]
+
+def render_load_order(text, mods):
+    """
+    单次遍历原文本，只替换 [LoadOrder] 区块中的 Mod{N}Directory 行与 NumberOfModFiles，
+    其他区块、注释、键的写法与换行符原样保留 (含开头的 BOM)。没有该区块时追加到文件末尾。
+    """
+    nl = '\r\n' if '\r\n' in text else '\n'
+    lines = text.splitlines(keepends=True)
+    start = next((i for i, line in enumerate(lines) if line.strip().lstrip('\ufeff') == '[LoadOrder]'), None)
+    if start is None:
+        head = text if not text or text.endswith('\n') else text + nl
+        body = [f"Mod{i + 1}Directory = {m.mod_id},{m.enabled}{nl}" for i, m in enumerate(mods)]
+        return head + (nl if head else '') + f"[LoadOrder]{nl}" + ''.join(body) + f"NumberOfModFiles = {len(body)}{nl}"
+
+    end = next((j for j in range(start + 1, len(lines)) if lines[j].lstrip().startswith('[')), len(lines))
+    out = []
+    mods_at = None      # 新的 Mod 行插入位置 (原第一条 Mod 行处)
+    delim = ' = '       # 沿用原文件的分隔写法
+    count_at = None
+    for line in lines[start + 1:end]:
+        body = line.rstrip('\r\n')
+        cut = min((i for i in (body.find('='), body.find(':')) if i > 0), default=-1)
+        key = body[:cut].strip().lower() if cut > 0 and not body.lstrip().startswith(('#', ';')) else ''
+        if key.startswith('mod') and 'directory' in key:
+            if mods_at is None:
+                mods_at = len(out)
+                rest = body[cut + 1:]
+                delim = body[len(body[:cut].rstrip()):cut + 1] + rest[:len(rest) - len(rest.lstrip())]
+            continue
+        if key == 'numberofmodfiles':
+            rest = body[cut + 1:]
+            line = body[:cut + 1] + rest[:len(rest) - len(rest.lstrip())] + str(len(mods)) + line[len(body):]
+            count_at = len(out)
+        out.append(line)
+
+    if mods_at is None:
+        # 没有 Mod 行时放在 NumberOfModFiles 之前，否则放在区块末尾的空行之前
+        mods_at = count_at if count_at is not None else len(out)
+        while count_at is None and mods_at and not out[mods_at - 1].strip():
+            mods_at -= 1
+    new_lines = [f"Mod{i + 1}Directory{delim}{m.mod_id},{m.enabled}{nl}" for i, m in enumerate(mods)]
+    if count_at is None:
+        new_lines.append(f"NumberOfModFiles{delim}{len(mods)}{nl}")
+    out[mods_at:mods_at] = new_lines
+    # 原区块最后一行可能没有换行符 (文件末尾)，后面接了新行时补上
+    for i in range(len(out) - 1):
+        if not out[i].endswith('\n'):
+            out[i] += nl
+    if end < len(lines) and out and not out[-1].endswith('\n'):
+        out[-1] += nl
+    return ''.join(lines[:start + 1]) + ''.join(out) + ''.join(lines[end:])
+
+class LoadOrderWriter:
+    """
+    usersettings.ini 的 [LoadOrder] 写入器：
+    - 只改写 [LoadOrder] 区块 (不经 configparser 重新格式化整个文件)
+    - 加载顺序未变化时不写文件、不产生备份
+    - 先写同目录临时文件再 os.replace，中途退出不会留下半个文件
+    - 备份带时间戳，只保留最近 backup_count 份 (0 为不备份)
+    用法: prepare(mods) -> 有变化时 backup() -> commit()
+    """
+    def __init__(self, config_path, backup_count=DEFAULT_BACKUP_COUNT):
+        self.config_path = config_path
+        self.backup_count = backup_count
+        self.old_text = None
+        self.new_text = None
+        self.backup_path = None
+
+    def prepare(self, mods):
+        """生成新文本，返回是否与原文件不同"""
+        with open(self.config_path, 'r', encoding=CONFIG_ENCODING, errors=CONFIG_ERRORS, newline='') as f:
+            self.old_text = f.read()
+        self.new_text = render_load_order(self.old_text, mods)
+        return self.new_text != self.old_text
+
+    def backup(self):
+        """写入 usersettings.ini.YYYYmmdd-HHMMSS.bak 并清理超出保留数的旧备份"""
+        if self.backup_count <= 0: return None
+        import shutil
+        base = f"{self.config_path}.{time.strftime('%Y%m%d-%H%M%S')}"
+        path, n = base + ".bak", 1
+        while os.path.exists(path):
+            path, n = f"{base}-{n}.bak", n + 1
+        shutil.copy2(self.config_path, path)
+        self.backup_path = path
+        for old in self.list_backups()[:-self.backup_count]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+        return path
+
+    def list_backups(self):
+        """按时间从旧到新返回已有的时间戳备份 (不包括旧版的 usersettings.ini.bak)"""
+        import re
+        folder = os.path.dirname(os.path.abspath(self.config_path))
+        pat = re.compile(re.escape(os.path.basename(self.config_path)) + r'\.(\d{8}-\d{6})(?:-(\d+))?\.bak$')
+        found = []
+        for name in os.listdir(folder):
+            m = pat.match(name)
+            if m:
+                found.append((m.group(1), int(m.group(2) or 0), os.path.join(folder, name)))
+        return [p for _, _, p in sorted(found)]
+
+    def commit(self):
+        """原子替换原文件"""
+        import shutil, tempfile
+        folder = os.path.dirname(os.path.abspath(self.config_path))
+        fd, tmp = tempfile.mkstemp(prefix=os.path.basename(self.config_path) + ".", suffix=".tmp", dir=folder)
+        try:
+            with os.fdopen(fd, 'w', encoding=CONFIG_ENCODING, errors=CONFIG_ERRORS, newline='') as f:
+                f.write(self.new_text)
+                f.flush()
+                os.fsync(f.fileno())
+            try:
+                shutil.copymode(self.config_path, tmp)
+            except OSError:
+                pass
+            os.replace(tmp, self.config_path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        self.old_text = self.new_text
+
+def preset_data(mods):
+    """导出预设：只存 ID、名字 (方便人看) 与开关，加载时只认 ID"""
+    data = []
+    for m in mods:
+        d_name = m.get_display_name("cn")
+        data.append({"id": m.mod_id, "n": d_name, "e": m.enabled})
+    return data
+
+class PresetDiff:
+    """
+    预设与当前加载顺序之间的差异。order 为应用后的完整顺序；
+    moves 为需要移动的最少模组 (其余模组的相对顺序本来就与预设一致)。
+    """
+    def __init__(self, order, enable, disable, moves, missing):
+        self.order = order
+        self.enable = enable
+        self.disable = disable
+        self.moves = moves
+        self.missing = missing   # "名字 (ID)"，预设中有但本地没有
+
+    @property
+    def changed(self):
+        return bool(self.enable or self.disable or self.moves)
+
+def diff_preset(model, data):
+    """
+    计算应用预设所需的改动：预设中的模组按其顺序与开关排在前面，
+    其余本地模组保持原顺序并关闭。不修改模型。
+    """
+    head = []
+    want = {}
+    missing = []
+    for p in data:
+        mid = p.get('id')
+        if mid in want:
+            continue
+        if mid in model:
+            head.append(mid)
+            want[mid] = bool(p.get('e', True))
+        else:
+            missing.append(f"{p.get('n', mid)} ({mid})")
+    order = head + [mid for mid in model.order if mid not in want]
+    enable = [mid for mid in order if want.get(mid, False) and not model.get(mid).enabled]
+    disable = [mid for mid in order if not want.get(mid, False) and model.get(mid).enabled]
+    return PresetDiff(order, enable, disable, moved_ids(model, order), missing)
+
+def moved_ids(model, order):
+    """order 中不属于 "当前位置的最长递增子序列" 的模组，即最少需要移动的模组"""
+    import bisect
+    seq = [model.index(mid) for mid in order]
+    tails = []       # tails[k] = 长度 k+1 的递增子序列的最小结尾值
+    tails_at = []    # 对应的 seq 下标
+    parent = [-1] * len(seq)
+    for i, v in enumerate(seq):
+        k = bisect.bisect_left(tails, v)
+        if k == len(tails):
+            tails.append(v)
+            tails_at.append(i)
+        else:
+            tails[k] = v
+            tails_at[k] = i
+        parent[i] = tails_at[k - 1] if k else -1
+    keep = set()
+    i = tails_at[-1] if tails_at else -1
+    while i >= 0:
+        keep.add(i)
+        i = parent[i]
+    return [mid for i, mid in enumerate(order) if i not in keep]
+
+def apply_preset_diff(model, diff):
+    """只应用差异部分，返回开关状态改变的 ModItem 列表"""
+    model.set_order(diff.order)
+    return model.set_enabled(diff.enable, True) + model.set_enabled(diff.disable, False)
+
+class PresetLibrary:
+    """
+    Presets 文件夹的索引：各预设的模组数、启用数与签名 (mtime_ns, size) 缓存在 index_path
+    (Presets 文件夹之外，不会与预设混在一起)，签名未变的预设列出时无需解析；
+    读取过的预设内容留在内存中，来回切换时不再读盘。
+    """
+    VERSION = 1
+
+    def __init__(self, folder, index_path):
+        self.folder = folder
+        self.index_path = index_path
+        self.entries = None   # 文件名 -> {"sig": [mtime_ns, size], "count": n, "enabled": n}
+        self.dirty = False
+        self._data = {}       # 文件名 -> (sig, data)
+
+    def _load_index(self):
+        self.entries = {}
+        self._drop_legacy_index()
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                d = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"Preset index ignored: {e}")
+            return
+        if d.get("version") == self.VERSION:
+            self.entries = d.get("presets", {})
+
+    def _drop_legacy_index(self):
+        """删除旧版写在 Presets 文件夹内的索引 (内容确为索引时才删，同名的预设不受影响)"""
+        path = os.path.join(self.folder, PRESET_LEGACY_INDEX)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                d = json.load(f)
+            if isinstance(d, dict) and "version" in d and "presets" in d:
+                os.remove(path)
+        except (OSError, ValueError):
+            pass
+
+    def scan(self):
+        """返回 [(文件名, 索引项)]，按修改时间从新到旧；新增或改动过的预设才会被解析"""
+        if self.entries is None:
+            self._load_index()
+        out = []
+        try:
+            it = os.scandir(self.folder)
+        except FileNotFoundError:
+            return out
+        with it:
+            for e in it:
+                name = e.name
+                if not name.lower().endswith(".json") or not e.is_file():
+                    continue
+                st = e.stat()
+                sig = [st.st_mtime_ns, st.st_size]
+                ent = self.entries.get(name)
+                if ent is None or ent.get("sig") != sig:
+                    try:
+                        data = self.load(name)
+                    except (OSError, ValueError) as ex:
+                        print(f"Preset skipped {name}: {ex}")
+                        continue
+                    ent = {"sig": sig, "count": len(data), "enabled": sum(1 for p in data if p.get('e', True))}
+                    self.entries[name] = ent
+                    self.dirty = True
+                out.append((name, ent))
+        if len(out) != len(self.entries):
+            live = {name for name, _ in out}
+            for name in [n for n in self.entries if n not in live]:
+                del self.entries[name]
+                self._data.pop(name, None)
+            self.dirty = True
+        self.save()
+        out.sort(key=lambda x: x[1]["sig"][0], reverse=True)
+        return out
+
+    def load(self, name):
+        """读取预设内容 (文件未变时直接返回内存中的结果)"""
+        path = os.path.join(self.folder, name)
+        st = os.stat(path)
+        sig = [st.st_mtime_ns, st.st_size]
+        cached = self._data.get(name)
+        if cached is not None and cached[0] == sig:
+            return cached[1]
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, list) or not all(isinstance(p, dict) for p in data):
+            raise ValueError("preset must be a JSON list of objects")
+        self._data[name] = (sig, data)
+        return data
+
+    def save(self):
+        if not self.dirty:
+            return
+        tmp_path = self.index_path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"version": self.VERSION, "presets": self.entries}, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, self.index_path)
+            self.dirty = False
+        except OSError as e:
+            print(f"Preset index save failed: {e}")
+
+# ==========================================
+# 元数据持久缓存
+# ==========================================
+class WorkshopCache:
+    """
+    按创意工坊目录保存的 JSON 缓存基类，文件内容为 {"version", "root", "mods": {mod_id: 条目}}。
+    目录或版本不同时整体作废；保存时先写临时文件再替换。
+    """
+    VERSION = 1
+    LABEL = "Cache"
+
+    def __init__(self, path):
+        self.path = path
+        self.root = None
+        self.entries = {}
+        self.dirty = False
+        self._lock = threading.Lock()  # 条目会在后台线程中并发读写
+
+    def open(self, workshop_root_path):
+        """按创意工坊目录读取缓存文件；目录未变时复用内存中的缓存并返回 False"""
+        root = os.path.normcase(os.path.abspath(workshop_root_path))
+        if root == self.root:
+            return False
+        self.root = root
+        self.entries = {}
+        self.dirty = False
+        if not os.path.exists(self.path):
+            return True
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                d = json.load(f)
+        except Exception as e:
+            print(f"{self.LABEL} ignored: {e}")
+            return True
+        if d.get("version") != self.VERSION or d.get("root") != self.root:
+            self.dirty = True
+            return True
+        self.entries = d.get("mods", {})
+        return True
+
+    def save(self):
+        if not self.dirty:
+            return
+        with self._lock:
+            d = {"version": self.VERSION, "root": self.root, "mods": dict(self.entries)}
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(d, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        except OSError as e:
+            print(f"{self.LABEL} save failed: {e}")
+
+    def discard(self, mod_ids):
+        """丢弃指定模组的条目 (文件夹已知发生变化)"""
+        with self._lock:
+            for k in mod_ids:
+                if self.entries.pop(k, None) is not None:
+                    self.dirty = True
+
+    def prune(self, keep_ids):
+        """清理已退订 / 不在加载列表中的模组，返回清理数量"""
+        keep = set(keep_ids)
+        with self._lock:
+            stale = [k for k in self.entries if k not in keep]
+            for k in stale:
+                del self.entries[k]
+            if stale:
+                self.dirty = True
+        return len(stale)
+
+class MetaCache(WorkshopCache):
+    """
+    模组元数据缓存，保存在 ModManagerConfig.json 旁的 ModMetaCache.json。
+    以文件夹 mtime 与信息文件 mtime+size 校验，未变化的模组不再 listdir/解析；
+    条目中的 "ws" 为 Steam 清单记录的更新时间，清单时间未变的模组连 stat 都省去。
+    只缓存名字，描述仍按需从信息文件读取。
+    """
+    VERSION = 2
+    LABEL = "Meta cache"
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.hits = 0
+        self.misses = 0
+        self.updated = []  # 本次读取中 Steam 清单显示已更新过的模组
+
+    def open(self, workshop_root_path):
+        if super().open(workshop_root_path):
+            self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.updated = []
+
+    def lookup_manifest(self, mod, mod_dir, ws_time):
+        """清单更新时间与缓存记录一致则直接填回 mod 并返回 True；记录不同说明 Steam 更新过该模组"""
+        e = self.entries.get(mod.mod_id)
+        ws = e.get("ws") if e is not None else None
+        if ws != ws_time:
+            if ws:
+                with self._lock:
+                    self.updated.append(mod.mod_id)
+            return False
+        self._apply(mod, e, mod_dir)
+        with self._lock:
+            self.hits += 1
+        return True
+
+    def lookup(self, mod, mod_dir, dir_stat, ws_time=0):
+        """校验通过则把缓存内容填回 mod 并返回 True (同时补记清单时间，下次可直接命中)"""
+        e = self.entries.get(mod.mod_id)
+        if not self._validate(e, mod_dir, dir_stat):
+            with self._lock:
+                self.misses += 1
+            return False
+
+        self._apply(mod, e, mod_dir)
+        with self._lock:
+            self.hits += 1
+            if ws_time and e.get("ws") != ws_time:
+                e["ws"] = ws_time
+                self.dirty = True
+        return True
+
+    def peek(self, mod):
+        """不校验文件夹，直接用缓存内容填充 mod (命令行列表用)，无缓存时返回 False"""
+        e = self.entries.get(mod.mod_id)
+        if e is None:
+            return False
+        self._apply(mod, e, os.path.join(self.root, mod.mod_id))
+        return True
+
+    @staticmethod
+    def _apply(mod, e, mod_dir):
+        mod.image_path = os.path.join(mod_dir, e["img"]) if e["img"] else None
+        mod.info_path = os.path.join(mod_dir, e["info"][0]) if e["info"] else None
+        mod.set_names(e["names"])
+
+    def _validate(self, e, mod_dir, dir_stat):
+        if e is None or e["dir"] != dir_stat.st_mtime_ns:
+            return False
+        info = e["info"]
+        if info:
+            TRACE.count("stat")
+            try:
+                st = os.stat(os.path.join(mod_dir, info[0]))
+            except OSError:
+                return False
+            if [st.st_mtime_ns, st.st_size] != info[1:]:
+                return False
+        return True
+
+    def store(self, mod, dir_index, ws_time=0):
+        info = None
+        if dir_index.info_file:
+            st = dir_index.info_stat
+            info = [dir_index.info_file, st.st_mtime_ns, st.st_size]
+        entry = {
+            "dir": dir_index.dir_stat.st_mtime_ns,
+            "info": info,
+            "img": os.path.basename(mod.image_path) if mod.image_path else None,
+            "names": mod.names_dict(),
+        }
+        if ws_time:
+            entry["ws"] = ws_time
+        with self._lock:
+            self.entries[mod.mod_id] = entry
+            self.dirty = True
+
+# ==========================================
+# 模组文件树缓存与冲突分析
+# ==========================================
+INFO_HINT_KEYS = {'loadafter': 'after', 'requires': 'after', 'loadbefore': 'before'}
+
+def walk_mod_files(mod_dir):
+    """
+    递归 os.scandir 遍历模组文件夹。
+    返回 ({相对目录: mtime_ns}, [[相对路径, size, mtime_ns], ...])，路径分隔符统一为 '/'。
+    """
+    dirs = {}
+    files = []
+    stack = [("", mod_dir)]
+    while stack:
+        rel, path = stack.pop()
+        TRACE.count("stat")
+        dirs[rel] = os.stat(path).st_mtime_ns
+        TRACE.count("scandir")
+        with os.scandir(path) as it:
+            for e in it:
+                r = f"{rel}/{e.name}" if rel else e.name
+                if e.is_dir(follow_symlinks=False):
+                    stack.append((r, e.path))
+                elif e.is_file():
+                    st = e.stat()
+                    files.append([r, st.st_size, st.st_mtime_ns])
+    TRACE.count("stat", len(files))
+    return dirs, files
+
+class FileTreeCache(WorkshopCache):
+    """
+    各模组文件夹完整文件列表的缓存 (ModFileCache.json)，冲突分析等后台任务共用。
+    以各级目录的 mtime 校验：目录都未变化时直接复用，不再递归遍历。
+    原地修改文件不会改变目录 mtime，用户明确要求时 (查找重复、重新统计体积) 传 stat_files=True，
+    对缓存中的文件逐个 stat 并更新；读取列表后的自动体积统计与冲突分析不做这一步。
+    """
+    VERSION = 1
+    LABEL = "File cache"
+
+    def files(self, mod_id, mod_dir, stat_files=False):
+        """返回 [[相对路径, size, mtime_ns], ...]；文件夹不存在时为 None (可在多个线程中调用)"""
+        e = self.entries.get(mod_id)
+        if e is not None and self._valid(mod_dir, e["dirs"]):
+            if not stat_files:
+                return e["files"]
+            files = self._restat(mod_dir, e["files"])
+            if files is not None:
+                if files is not e["files"]:
+                    with self._lock:
+                        self.entries[mod_id] = {"dirs": e["dirs"], "files": files}
+                        self.dirty = True
+                return files
+        try:
+            dirs, files = walk_mod_files(mod_dir)
+        except OSError:
+            with self._lock:
+                if self.entries.pop(mod_id, None) is not None:
+                    self.dirty = True
+            return None
+        with self._lock:
+            self.entries[mod_id] = {"dirs": dirs, "files": files}
+            self.dirty = True
+        return files
+
+    @staticmethod
+    def _restat(mod_dir, files):
+        """按当前 stat 更新文件列表，无变化时返回原列表；有文件无法 stat 时返回 None (需重新遍历)"""
+        out = None
+        TRACE.count("stat", len(files))
+        for i, (rel, size, mtime) in enumerate(files):
+            try:
+                st = os.stat(os.path.join(mod_dir, rel))
+            except OSError:
+                return None
+            if st.st_size != size or st.st_mtime_ns != mtime:
+                if out is None:
+                    out = [list(f) for f in files]
+                out[i] = [rel, st.st_size, st.st_mtime_ns]
+        return files if out is None else out
+
+    @staticmethod
+    def _valid(mod_dir, dirs):
+        TRACE.count("stat", len(dirs))
+        for rel, mtime in dirs.items():
+            try:
+                if os.stat(os.path.join(mod_dir, rel) if rel else mod_dir).st_mtime_ns != mtime:
+                    return False
+            except OSError:
+                return False
+        return True
+
+class JobCancelled(Exception):
+    """后台任务因 CancelEvent 被置位而中止"""
+
+class CancelEvent(threading.Event):
+    """
+    后台任务的取消标记，任务在处理每个模组之前检查。
+    set() 时同时关闭登记的进程池并丢弃尚未开始的任务 (正在计算的模组仍会算完)。
+    """
+    def __init__(self):
+        super().__init__()
+        self.pool = None
+
+    def set(self):
+        super().set()
+        pool = self.pool
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def check(self):
+        if self.is_set():
+            raise JobCancelled()
+
+def collect_file_trees(mod_ids, workshop_root_path, cache, workers=DEFAULT_SCAN_WORKERS, stat_files=False, cancel=None):
+    """
+    并行取得各模组的文件列表 (命中缓存的不再遍历)，返回 {mod_id: files}，缺失的模组不在结果中。
+    stat_files 见 FileTreeCache.files；cancel 被置位时跳过其余模组并抛出 JobCancelled。
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    def tree(mid):
+        if cancel is not None and cancel.is_set():
+            return None
+        return cache.files(mid, os.path.join(workshop_root_path, mid), stat_files)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="FileTree") as pool:
+        trees = {mid: t for mid, t in zip(mod_ids, pool.map(tree, mod_ids)) if t is not None}
+    if cancel is not None:
+        cancel.check()
+    return trees
+
+# 资源类型 (按扩展名)；Unity 资源包与贴图是游戏加载时间的主要来源
+ASSET_KINDS = {}
+for _kind, _exts in (
+        ("bundle", (".unity3d", ".bundle", ".assets", ".assetbundle", ".resource", ".ress")),
+        ("texture", (".dds", ".png", ".jpg", ".jpeg", ".tga", ".bmp", ".psd", ".tif", ".tiff")),
+        ("model", (".fbx", ".obj", ".dae", ".blend", ".3ds")),
+        ("audio", (".wav", ".ogg", ".mp3", ".bank", ".bnk", ".wem", ".flac")),
+        ("data", (".ini", ".txt", ".xml", ".json", ".csv", ".yaml", ".yml", ".cfg", ".lua", ".dll"))):
+    for _ext in _exts:
+        ASSET_KINDS[_ext] = _kind
+ASSET_KIND_ORDER = ("bundle", "texture", "model", "audio", "data", "other")
+
+class ModSize:
+    """模组文件夹的体积统计：总字节数、文件数与各资源类型的字节数"""
+    __slots__ = ('bytes', 'files', 'kinds')
+
+    def __init__(self, files):
+        kinds = {}
+        total = 0
+        for rel, size, _mtime in files:
+            kind = ASSET_KINDS.get(os.path.splitext(rel)[1].lower(), "other")
+            kinds[kind] = kinds.get(kind, 0) + size
+            total += size
+        self.bytes = total
+        self.files = len(files)
+        self.kinds = kinds
+
+def measure_mods(mod_ids, workshop_root_path, cache, workers=DEFAULT_SCAN_WORKERS, cancel=None, stat_files=False):
+    """
+    各模组的 ModSize (文件列表取自 FileTreeCache，未变化的文件夹不再遍历)，缺失的模组不在结果中。
+    stat_files 为 True 时逐个 stat 缓存中的文件 (用户要求重新统计时)，能发现原地修改的文件。
+    """
+    trees = collect_file_trees(mod_ids, workshop_root_path, cache, workers, stat_files=stat_files, cancel=cancel)
+    return {mid: ModSize(files) for mid, files in trees.items()}
+
+def format_size(n):
+    for unit in ("B", "KB", "MB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.2f} GB"
+
+class EnabledTotals:
+    """
+    已启用模组的合计 (模组数、字节数、文件数)。
+    开关状态或某个模组的体积变化时按差值增减，不重新遍历整个列表。
+    """
+    def __init__(self):
+        self.sizes = {}   # mod_id -> ModSize，跨多次读取保留，由后台统计更新
+        self.count = 0
+        self.bytes = 0
+        self.files = 0
+
+    def reset(self, mods):
+        self.count = self.bytes = self.files = 0
+        for m in mods:
+            if m.enabled:
+                self._add(m.mod_id, 1)
+
+    def _add(self, mod_id, sign):
+        self.count += sign
+        s = self.sizes.get(mod_id)
+        if s is not None:
+            self.bytes += sign * s.bytes
+            self.files += sign * s.files
+
+    def toggled(self, mods):
+        """mods 的开关状态刚刚改变"""
+        for m in mods:
+            self._add(m.mod_id, 1 if m.enabled else -1)
+
+    def set_sizes(self, model, sizes):
+        """写入新的统计结果 (None 表示未知)；已启用模组的旧值先减去再加上新值"""
+        for mid, size in sizes.items():
+            m = model.get(mid)
+            on = m is not None and m.enabled
+            if on:
+                self._add(mid, -1)
+            if size is None:
+                self.sizes.pop(mid, None)
+            else:
+                self.sizes[mid] = size
+            if on:
+                self._add(mid, 1)
+
+def parse_info_hints(file_path):
+    """
+    读取信息文件中可选的依赖提示 (任意区块，逗号/空格分隔的模组 ID)：
+    LoadAfter= / Requires= 本模组须在这些模组之后加载，LoadBefore= 须在之前。
+    返回 {'after': [...], 'before': [...], 'requires': [...]}。
+    """
+    hints = {'after': [], 'before': [], 'requires': []}
+    TRACE.count("open")
+    with open(file_path, 'r', encoding='utf-8-sig', errors='ignore') as f:
+        for line in f:
+            key, sep, val = line.partition('=')
+            if not sep:
+                continue
+            key = key.strip().lower()
+            kind = INFO_HINT_KEYS.get(key)
+            if kind is None:
+                continue
+            ids = [v for v in val.replace(';', ',').replace(',', ' ').split() if v]
+            hints[kind].extend(ids)
+            if key == 'requires':
+                hints['requires'].extend(ids)
+    return hints
+
+def is_game_file(rel_path):
+    """冲突分析只看游戏内容：忽略根目录下的 _info 文件与预览图"""
+    if '/' in rel_path:
+        return True
+    lower = rel_path.lower()
+    return not (lower.startswith('_info') or lower.endswith(IMAGE_EXTS))
+
+def build_overlap_index(order, trees):
+    """
+    文件 -> 按加载顺序排列的模组列表 (路径不区分大小写)。一次遍历所有文件，
+    不做模组两两比较；只返回被两个及以上模组提供的文件。
+    """
+    owners = {}
+    for mid in order:
+        files = trees.get(mid)
+        if not files:
+            continue
+        for rel, _size, _mtime in files:
+            if is_game_file(rel):
+                owners.setdefault(rel.casefold(), []).append(mid)
+    return {path: mids for path, mids in owners.items() if len(mids) > 1}
+
+def _cycle_groups(nodes, succ):
+    """Tarjan 强连通分量 (迭代实现)，返回 {mod_id: 分量编号}"""
+    index = {}
+    low = {}
+    comp = {}
+    stack = []
+    on_stack = set()
+    counter = 0
+    for root in nodes:
+        if root in index:
+            continue
+        work = [(root, iter(succ.get(root, ())))]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            v, it = work[-1]
+            w = next(it, None)
+            if w is not None:
+                if w not in index:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack.add(w)
+                    work.append((w, iter(succ.get(w, ()))))
+                elif w in on_stack:
+                    low[v] = min(low[v], index[w])
+                continue
+            work.pop()
+            if work:
+                low[work[-1][0]] = min(low[work[-1][0]], low[v])
+            if low[v] == index[v]:
+                while True:
+                    w = stack.pop()
+                    on_stack.discard(w)
+                    comp[w] = v
+                    if w == v:
+                        break
+    return comp
+
+def stable_topo_sort(order, edges):
+    """
+    按约束 (a, b) = a 须在 b 之前 排序。每次取原顺序中最靠前的可放置模组，
+    因此没有约束的模组保持原相对顺序。互相矛盾 (成环) 的约束忽略，相关模组保持原顺序。
+    返回 (新顺序, 处于环中的模组列表)。
+    """
+    import heapq
+    pos = {mid: i for i, mid in enumerate(order)}
+    succ = {}
+    for a, b in edges:
+        if a in pos and b in pos and a != b:
+            succ.setdefault(a, set()).add(b)
+    comp = _cycle_groups(order, succ)
+    sizes = {}
+    for c in comp.values():
+        sizes[c] = sizes.get(c, 0) + 1
+    cyclic = [mid for mid in order if sizes[comp[mid]] > 1]
+
+    indeg = dict.fromkeys(order, 0)
+    for a in succ:
+        succ[a] = [b for b in succ[a] if comp[a] != comp[b]]  # 去掉环内的约束
+        for b in succ[a]:
+            indeg[b] += 1
+    heap = [i for i, mid in enumerate(order) if indeg[mid] == 0]
+    heapq.heapify(heap)
+    out = []
+    while heap:
+        mid = order[heapq.heappop(heap)]
+        out.append(mid)
+        for b in succ.get(mid, ()):
+            indeg[b] -= 1
+            if indeg[b] == 0:
+                heapq.heappush(heap, pos[b])
+    return out, cyclic
+
+class ConflictReport:
+    """冲突分析结果；suggested_order() 按当前顺序重新计算，分析之后列表被调整过也能直接使用"""
+    def __init__(self, overlaps, edges, missing_deps, file_count):
+        self.overlaps = overlaps          # 文件 -> [mod_id...] (按加载顺序，最后一个生效)
+        self.edges = edges                # [(a, b)]：a 须在 b 之前
+        self.missing_deps = missing_deps  # [(mod_id, 依赖 ID)]：依赖未安装或未启用
+        self.file_count = file_count
+        # (被覆盖的模组, 生效的模组) -> [文件数, 示例文件]；每个文件只记到最后加载的模组上，
+        # 很多模组共有的文件不会产生两两组合
+        self.pairs = {}
+        for path, mids in overlaps.items():
+            winner = mids[-1]
+            for loser in mids[:-1]:
+                p = self.pairs.get((loser, winner))
+                if p is None:
+                    self.pairs[(loser, winner)] = [1, path]
+                else:
+                    p[0] += 1
+
+    def violations(self, model):
+        """当前顺序中违反依赖提示的约束"""
+        return [(a, b) for a, b in self.edges if a in model and b in model and model.index(a) > model.index(b)]
+
+    def suggested_order(self, model):
+        return stable_topo_sort(model.order, self.edges)
+
+def analyze_conflicts(model, workshop_root_path, cache, workers=DEFAULT_SCAN_WORKERS, cancel=None):
+    """
+    遍历 (或从缓存取得) 各模组的文件树，建立文件重叠索引，并读取信息文件中的依赖提示。
+    可在后台线程中调用，只读取模型。
+    """
+    order = list(model.order)
+    trees = collect_file_trees(order, workshop_root_path, cache, workers, cancel=cancel)
+    edges = []
+    missing = []
+    for mid in order:
+        m = model.get(mid)
+        if m is None or not m.info_path:
+            continue
+        try:
+            hints = parse_info_hints(m.info_path)
+        except OSError:
+            continue
+        edges += [(dep, mid) for dep in hints['after']]
+        edges += [(mid, dep) for dep in hints['before']]
+        if m.enabled:
+            for dep in hints['requires']:
+                d = model.get(dep)
+                if d is None or not d.enabled:
+                    missing.append((mid, dep))
+    overlaps = build_overlap_index(order, trees)
+    return ConflictReport(overlaps, edges, missing, sum(len(t) for t in trees.values()))
+
+# ==========================================
+# 内容摘要与重复模组检测
+# ==========================================
+def hash_file(path):
+    """文件内容摘要 (blake2b-128)：小文件分块读取，大文件 mmap 后整体送入"""
+    import hashlib
+    h = hashlib.blake2b(digest_size=16)
+    TRACE.count("open")
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= HASH_MMAP_MIN:
+            import mmap
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                h.update(mm)
+        else:
+            buf = bytearray(HASH_CHUNK)
+            view = memoryview(buf)
+            while True:
+                n = f.readinto(buf)
+                if not n:
+                    break
+                h.update(view[:n])
+    return h.hexdigest()
+
+def hash_files_task(mod_dir, rels):
+    """进程池任务：返回与 rels 一一对应的摘要，读取失败的为 None"""
+    out = []
+    for rel in rels:
+        try:
+            out.append(hash_file(os.path.join(mod_dir, rel)))
+        except OSError:
+            out.append(None)
+    return out
+
+class HashCache(WorkshopCache):
+    """各模组文件内容摘要 (ModHashCache.json)：mod_id -> {相对路径: [size, mtime_ns, 摘要]}"""
+    VERSION = 1
+    LABEL = "Hash cache"
+
+    def stale_files(self, mod_id, files):
+        """files 中 size 或 mtime 与缓存不同 (需要重新计算摘要) 的相对路径"""
+        cached = self.entries.get(mod_id, {})
+        return [rel for rel, size, mtime in files if cached.get(rel, [None, None])[:2] != [size, mtime]]
+
+    def update(self, mod_id, files, digests):
+        """按最新文件列表重建条目，digests 为新算出的 {相对路径: 摘要}，其余沿用缓存"""
+        old = self.entries.get(mod_id, {})
+        new = {}
+        for rel, size, mtime in files:
+            d = digests.get(rel)
+            if d is None:
+                o = old.get(rel)
+                d = o[2] if o and o[:2] == [size, mtime] else None
+            if d is not None:
+                new[rel] = [size, mtime, d]
+        if new != old:
+            with self._lock:
+                self.entries[mod_id] = new
+                self.dirty = True
+        return new
+
+def mod_digest(keys):
+    """模组整体摘要：排序后的 (相对路径, 文件摘要) 再做一次摘要"""
+    import hashlib
+    h = hashlib.blake2b(digest_size=16)
+    for rel, d in sorted(keys):
+        h.update(f"{rel}\0{d}\n".encode('utf-8'))
+    return h.hexdigest()
+
+class DuplicateReport:
+    """groups：内容完全相同的模组组；contained：mod_id -> 包含其全部文件的另一个模组"""
+    def __init__(self, groups, contained, mod_count, hashed_files):
+        self.groups = groups
+        self.contained = contained
+        self.mod_count = mod_count
+        self.hashed_files = hashed_files  # 本次实际读取计算的文件数 (其余命中缓存)
+
+def find_duplicates(file_maps):
+    """
+    file_maps: {mod_id: {相对路径: [size, mtime_ns, 摘要]}}。
+    相同模组按整体摘要分组；"被包含" 用 (路径, 摘要) -> 模组 的倒排表求交集，
+    从出现次数最少的文件开始，不做模组两两比较。
+    """
+    sets = {}
+    for mid, files in file_maps.items():
+        keys = frozenset((rel.casefold(), v[2]) for rel, v in files.items() if is_game_file(rel))
+        if keys:
+            sets[mid] = keys
+    by_digest = {}
+    for mid, keys in sets.items():
+        by_digest.setdefault(mod_digest(keys), []).append(mid)
+    groups = [sorted(g) for g in by_digest.values() if len(g) > 1]
+
+    postings = {}
+    for mid, keys in sets.items():
+        for k in keys:
+            postings.setdefault(k, []).append(mid)
+    contained = {}
+    for mid, keys in sets.items():
+        cand = None
+        for k in sorted(keys, key=lambda k: len(postings[k])):
+            if cand is None:
+                cand = set(postings[k])
+                cand.discard(mid)
+            else:
+                cand.intersection_update(postings[k])
+            if not cand:
+                break
+        cand = [c for c in cand or () if len(sets[c]) > len(keys)]
+        if cand:
+            contained[mid] = min(cand, key=lambda c: (len(sets[c]), c))
+    return DuplicateReport(groups, contained, len(sets), 0)
+
+def scan_duplicates(workshop_root_path, file_cache, hash_cache, workers=DEFAULT_SCAN_WORKERS, processes=DEFAULT_HASH_WORKERS,
+                    cancel=None):
+    """
+    对创意工坊目录下的所有模组文件夹计算文件摘要 (size + mtime 未变的沿用缓存)，
+    读取与摘要在进程池中进行 (每个模组一个任务)，返回 DuplicateReport。在后台线程中调用。
+    cancel (CancelEvent) 被置位时关闭进程池并抛出 JobCancelled，已算出的摘要不写入缓存。
+    """
+    from concurrent.futures import ProcessPoolExecutor, CancelledError
+    import multiprocessing
+    mod_ids = sorted(index_workshop(workshop_root_path))
+    trees = collect_file_trees(mod_ids, workshop_root_path, file_cache, workers, stat_files=True, cancel=cancel)
+    todo = [(mid, hash_cache.stale_files(mid, files)) for mid, files in trees.items()]
+    todo = [(mid, rels) for mid, rels in todo if rels]
+    new = {}
+    if todo:
+        # spawn：避免在带有 Tk 与线程的进程中 fork
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max(1, min(processes, len(todo), os.cpu_count() or 1)), mp_context=ctx) as pool:
+            if cancel is not None:
+                cancel.pool = pool
+                cancel.check()  # 登记之前已被取消
+            try:
+                futures = [pool.submit(hash_files_task, os.path.join(workshop_root_path, mid), rels) for mid, rels in todo]
+                for (mid, rels), fut in zip(todo, futures):
+                    if cancel is not None:
+                        cancel.check()
+                    try:
+                        digests = fut.result()
+                    except CancelledError:
+                        raise JobCancelled()
+                    new[mid] = {rel: d for rel, d in zip(rels, digests) if d is not None}
+                    TRACE.count("open", len(rels))  # 子进程中的计数不会传回，这里代为记录
+            finally:
+                if cancel is not None:
+                    cancel.pool = None
+    file_maps = {mid: hash_cache.update(mid, files, new.get(mid, {})) for mid, files in trees.items()}
+    file_cache.prune(mod_ids)
+    hash_cache.prune(mod_ids)
+    report = find_duplicates(file_maps)
+    report.hashed_files = sum(len(rels) for _, rels in todo)
+    return report
+
+# ==========================================
+# 配置方案 (多套游戏安装 / 配置文件)
+# ==========================================
+def profile_paths(settings, name):
+    """
+    配置方案 name 的 {"config_path", "mod_root_path"}；不存在时返回 None。
+    旧版 ModManagerConfig.json 没有 profiles，顶层路径即为当前 (default) 方案。
+    """
+    p = settings.get("profiles", {}).get(name)
+    if p is None and name == settings.get("profile", DEFAULT_PROFILE):
+        p = {"config_path": settings.get("config_path", ""), "mod_root_path": settings.get("mod_root_path", "")}
+    return p
+
+def profile_cache_dir(app_dir, name):
+    """各方案的缓存目录：default 沿用程序目录 (与旧版缓存兼容)，其余为 Profiles/<名字>/"""
+    if name == DEFAULT_PROFILE:
+        return app_dir
+    safe = "".join(c if c.isalnum() or c in "-_. " else "_" for c in name).strip(" .") or "_"
+    if safe != name:
+        import hashlib
+        safe += "-" + hashlib.sha1(name.encode('utf-8')).hexdigest()[:8]  # 避免不同名字映射到同一目录
+    return os.path.join(app_dir, PROFILE_DIR, safe)
+
+def save_last_order(path, mods):
+    """记录与磁盘一致的加载顺序 [[mod_id, enabled], ...]，切换回该方案时先据此显示列表"""
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump([[m.mod_id, m.enabled] for m in mods], f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Last load order not saved: {e}")
+
+def load_last_order(path):
+    """读取 save_last_order 的结果，返回 [ModItem...]；不存在或损坏时返回 None"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return [ModItem(str(mid), bool(en)) for mid, en in json.load(f)]
+    except (OSError, ValueError, TypeError):
+        return None
+
+# ==========================================
+# 命令行接口 (不加载 tkinter / PIL)
+# ==========================================
+CLI_COMMANDS = ("list", "enable", "disable", "apply-preset", "export")
+
+def load_app_settings(app_dir):
+    """读取 ModManagerConfig.json，不存在或损坏时返回空字典"""
+    try:
+        with open(os.path.join(app_dir, APP_CONFIG_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _cli_parser():
+    import argparse
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--config", help="usersettings.ini path (default: config_path in ModManagerConfig.json)")
+    common.add_argument("--mods", help="workshop content dir, used for mod names (default: mod_root_path)")
+    common.add_argument("--profile", help="use the paths and caches of this profile (default: the last used profile)")
+
+    ap = argparse.ArgumentParser(
+        prog="ModManager.py",
+        description="Sea Power mod manager, headless mode. Run without arguments to start the GUI.")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("list", parents=[common], help="print the load order")
+    p.add_argument("--json", action="store_true", help="print as JSON")
+
+    for name, text in (("enable", "enable mods"), ("disable", "disable mods")):
+        p = sub.add_parser(name, parents=[common], help=text)
+        p.add_argument("ids", nargs="+", metavar="ID")
+        p.add_argument("--no-backup", action="store_true", help="do not write a timestamped usersettings.ini backup")
+
+    p = sub.add_parser("apply-preset", parents=[common], help="apply a preset JSON to usersettings.ini")
+    p.add_argument("preset", help="preset file, absolute or relative to the Presets folder")
+    p.add_argument("--dry-run", action="store_true", help="only print the changes the preset would make")
+    p.add_argument("--no-backup", action="store_true", help="do not write a timestamped usersettings.ini backup")
+
+    p = sub.add_parser("export", parents=[common], help="export the load order as a preset JSON")
+    p.add_argument("output", nargs="?", help="output file (default: stdout)")
+    return ap
+
+def _cli_save(args, model):
+    writer = LoadOrderWriter(args.config, 0 if args.no_backup else args.backup_count)
+    try:
+        if not writer.prepare(model):
+            print("Load order unchanged, nothing written.")
+            return 0
+    except (OSError, ValueError) as e:
+        print(f"Cannot read {args.config}: {e}", file=sys.stderr)
+        return 1
+    try:
+        writer.backup()
+    except OSError as e:
+        print(f"Backup failed: {e} (use --no-backup to skip)", file=sys.stderr)
+        return 1
+    try:
+        writer.commit()
+    except (OSError, ValueError) as e:
+        print(f"Cannot write {args.config}: {e}", file=sys.stderr)
+        return 1
+    print(f"Saved {args.config}" + (f" (backup: {os.path.basename(writer.backup_path)})" if writer.backup_path else ""))
+    return 0
+
+def cli_main(argv):
+    """命令行入口，返回进程退出码"""
+    args = _cli_parser().parse_args(argv)
+    app_dir = get_app_path()
+    settings = load_app_settings(app_dir)
+    profile = args.profile or settings.get("profile", DEFAULT_PROFILE)
+    paths = profile_paths(settings, profile)
+    if paths is None:
+        names = sorted(settings.get("profiles", {})) or [DEFAULT_PROFILE]
+        print(f"Unknown profile: {profile} (available: {', '.join(names)})", file=sys.stderr)
+        return 1
+    args.config = args.config or paths.get("config_path", "")
+    args.mods = args.mods or paths.get("mod_root_path", "")
+    args.backup_count = max(0, int(settings.get("backup_count", DEFAULT_BACKUP_COUNT)))
+
+    if not args.config or not os.path.isfile(args.config):
+        print(f"usersettings.ini not found: {args.config or '(not configured)'}", file=sys.stderr)
+        return 1
+    issues = []
+    try:
+        mods = read_load_order(args.config, issues)
+    except OSError as e:
+        print(f"Cannot read {args.config}: {e}", file=sys.stderr)
+        return 1
+    for no, text in issues:
+        print(f"{args.config}:{no}: {text}", file=sys.stderr)
+    if mods is None:
+        print(f"No [LoadOrder] section in {args.config}", file=sys.stderr)
+        return 1
+    model = ModListModel(mods)
+
+    # 名字只取自元数据缓存，不扫描创意工坊目录
+    if args.mods and args.command in ("list", "export"):
+        cache = MetaCache(os.path.join(profile_cache_dir(app_dir, profile), META_CACHE_FILE))
+        cache.open(args.mods)
+        manifest = read_manifest(manifest_path(args.mods))
+        for m in model:
+            cache.peek(m)
+            if not m.names and manifest is not None and manifest.title(m.mod_id):
+                m.set_names({MANIFEST_TITLE_LANG: manifest.title(m.mod_id)})
+
+    if args.command == "list":
+        rows = [(i + 1, m, m.get_display_name(settings.get("lang", "cn"))) for i, m in enumerate(model)]
+        if args.json:
+            print(json.dumps([{"index": i, "id": m.mod_id, "enabled": m.enabled, "name": n} for i, m, n in rows],
+                             indent=4, ensure_ascii=False))
+        else:
+            for i, m, n in rows:
+                print(f"{i:>4}  {'ON ' if m.enabled else 'OFF'}  {m.mod_id:<12}  {n}")
+        return 0
+
+    if args.command == "export":
+        text = json.dumps(preset_data(model), indent=4, ensure_ascii=False)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(text)
+        else:
+            print(text)
+        return 0
+
+    if args.command in ("enable", "disable"):
+        unknown = [mid for mid in args.ids if mid not in model]
+        if unknown:
+            print(f"Not in load order: {', '.join(unknown)}", file=sys.stderr)
+            return 1
+        for mid in args.ids:
+            model.get(mid).enabled = args.command == "enable"
+        return _cli_save(args, model)
+
+    if args.command == "apply-preset":
+        fn = args.preset
+        if not os.path.isfile(fn) and os.path.isfile(os.path.join(app_dir, PRESET_DIR, fn)):
+            fn = os.path.join(app_dir, PRESET_DIR, fn)
+        try:
+            with open(fn, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Cannot read preset {fn}: {e}", file=sys.stderr)
+            return 1
+        try:
+            diff = diff_preset(model, data)
+        except (AttributeError, TypeError) as e:
+            print(f"Invalid preset {fn}: {e}", file=sys.stderr)
+            return 1
+        for desc in diff.missing:
+            print(f"Missing locally: {desc}", file=sys.stderr)
+        print(f"Move {len(diff.moves)}, enable {len(diff.enable)}, disable {len(diff.disable)}, missing {len(diff.missing)}")
+        if args.dry_run:
+            for label, ids in (("enable", diff.enable), ("disable", diff.disable), ("move", diff.moves)):
+                for mid in ids:
+                    print(f"  {label:<8}{mid}")
+            return 0
+        apply_preset_diff(model, diff)
+        return _cli_save(args, model)
+    return 2
@@ -0,0 +1,2259 @@
+import time
+import os
+import sys
+import json
+import threading
+
+# 核心数据类、缓存与命令行共用的部分
+from ModManagerCore import (
+    APP_CONFIG_FILE, ASSET_KIND_ORDER, DEFAULT_BACKUP_COUNT, DEFAULT_HASH_WORKERS, DEFAULT_PROFILE,
+    DEFAULT_SCAN_WORKERS, DEFAULT_THUMB_CACHE_MB, DEFAULT_VIRTUAL_THRESHOLD, DRAG_EDGE_PX, DRAG_FRAME_MS,
+    DRAG_SCROLL_ACCEL, DRAG_SCROLL_MAX, DRAG_SCROLL_MS, FILE_CACHE_FILE, HASH_CACHE_FILE, INFO_DESC_KEY,
+    LAST_ORDER_FILE, META_CACHE_FILE, PRESET_DIR, PRESET_INDEX_FILE, SCAN_POLL_MS, STARTUP, THUMB_DIR,
+    THUMB_DISK_MAX_FILES, THUMB_PREFETCH_RADIUS, THUMB_SIZE, TRACE, TRACE_STATUS_SPANS, UI_LANG_DATA,
+    WATCH_DEBOUNCE_MS, WATCH_INOTIFY_MS, WATCH_POLL_MS,
+    CancelEvent, EnabledTotals, FileTreeCache, HashCache, LoadOrderWriter, MetaCache, ModListModel, ModListView,
+    PresetLibrary, analyze_conflicts, apply_preset_diff, diff_preset, format_size, get_app_path, index_workshop,
+    load_last_order, manifest_path, measure_mods, moved_ids, parse_info_file, preset_data, profile_cache_dir,
+    read_load_order, read_manifest, save_last_order, scan_duplicates)
+
+# ==========================================
+# 图形界面依赖 (命令行模式不会导入本模块)
+# ==========================================
+STARTUP.mark("import core")
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox, font, simpledialog
+STARTUP.mark("import tkinter")
+import queue
+import bisect
+import struct
+import re
+import unicodedata
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+STARTUP.mark("import stdlib (gui)")
+
+# PIL 只在第一次显示图片时导入 (pip install pillow)
+Image = ImageTk = None
+
+def _load_pil():
+    global Image, ImageTk
+    if ImageTk is None:
+        with STARTUP.timed("import PIL (lazy)"):
+            from PIL import Image as _Image, ImageTk as _ImageTk
+        Image, ImageTk = _Image, _ImageTk
+
+# ==========================================
+# 后台并行扫描
+# ==========================================
+class WorkshopScan:
+    """
+    用有界线程池并行执行 ModItem.load_info。
+    工作线程只写入各自的 ModItem，完成的序号通过队列交回主线程 (由 root.after 轮询)。
+    """
+    def __init__(self, mods, workshop_root_path, cache=None, workers=DEFAULT_SCAN_WORKERS, root_index=None, manifest=None):
+        self.mods = mods
+        self.total = len(mods)
+        self.done = 0
+        self.cancelled = False
+        self._queue = queue.Queue()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="ModScan")
+        for i, m in enumerate(mods):
+            self._pool.submit(self._work, i, m, workshop_root_path, cache, root_index, manifest)
+        self._pool.shutdown(wait=False)
+
+    def _work(self, idx, mod, workshop_root_path, cache, root_index, manifest):
+        if self.cancelled:
+            return
+        try:
+            mod.load_info(workshop_root_path, cache, root_index, manifest)
+        except Exception as e:
+            print(f"Scan error {mod.mod_id}: {e}")
+        self._queue.put(idx)
+
+    def drain(self, limit=500):
+        """取出已完成的模组序号 (主线程调用)，每次最多 limit 个以免单帧卡顿"""
+        out = []
+        try:
+            while len(out) < limit:
+                out.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        self.done += len(out)
+        return out
+
+    @property
+    def finished(self):
+        return self.done >= self.total
+
+    def cancel(self):
+        self.cancelled = True
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+# ==========================================
+# 文件系统监视 (inotify / 轮询)
+# ==========================================
+def file_signature(path):
+    """(mtime_ns, size)，文件不存在时为 None"""
+    TRACE.count("stat")
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+class _Inotify:
+    """通过 ctypes 调用 libc 的 inotify，非阻塞读取"""
+    IN_ATTRIB = 0x4
+    IN_CLOSE_WRITE = 0x8
+    IN_MOVED_FROM = 0x40
+    IN_MOVED_TO = 0x80
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_DELETE_SELF = 0x400
+    IN_MOVE_SELF = 0x800
+    IN_Q_OVERFLOW = 0x4000
+    IN_IGNORED = 0x8000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    DIR_MASK = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+
+    def __init__(self):
+        import ctypes, ctypes.util
+        self._ctypes = ctypes
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.wds = {}  # wd -> 目录路径
+
+    def add(self, path, mask=DIR_MASK):
+        wd = self._add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            err = self._ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        self.wds[wd] = path
+
+    def read(self):
+        """返回 [(目录, 文件名, mask)]，没有事件时为空列表"""
+        out = []
+        size = self.EVENT.size
+        while True:
+            try:
+                buf = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            if not buf:
+                break
+            pos = 0
+            while pos + size <= len(buf):
+                wd, mask, _cookie, n = self.EVENT.unpack_from(buf, pos)
+                name = os.fsdecode(buf[pos + size:pos + size + n].rstrip(b"\0"))
+                pos += size + n
+                out.append((self.wds.get(wd), name, mask))
+                if mask & self.IN_IGNORED:
+                    self.wds.pop(wd, None)
+        return out
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+class WorkshopWatcher:
+    """
+    监视创意工坊目录 (根目录 + 加载顺序中的各模组文件夹) 与 usersettings.ini。
+    Linux 上使用 inotify；其他平台或 inotify 不可用 (如监视数上限) 时退回轮询，比较各文件夹的 mtime。
+    poll() 由主线程经 root.after 调用，返回 (变化的 mod_id 集合, usersettings.ini 是否变化)。
+    轮询模式下目录扫描与比较都在后台线程中进行，主线程只取走算好的差异，不会因大目录或网络盘卡顿。
+    """
+    def __init__(self, workshop_root_path, config_path, mods):
+        self.root_path = os.path.normpath(workshop_root_path)
+        self.config_path = os.path.normpath(os.path.abspath(config_path))
+        self.mods = {m.mod_id: m for m in mods}
+        self.mod_ids = self.mods.keys()
+        self._ino = None
+        self._snapshot = None   # 只由轮询线程读写
+        self._pool = None
+        self._pending = None    # 正在进行的 _snapshot_diff
+        if sys.platform.startswith("linux"):
+            try:
+                self._ino = _Inotify()
+                self._watch_all()
+            except (OSError, AttributeError) as e:
+                print(f"inotify unavailable, falling back to polling: {e}")
+                self._close_inotify()
+        if self._ino is None:
+            self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ModWatch")
+            self._pending = self._pool.submit(self._snapshot_diff)  # 第一次只建立基准
+
+    @property
+    def backend(self):
+        return "inotify" if self._ino is not None else "poll"
+
+    @property
+    def interval(self):
+        return WATCH_INOTIFY_MS if self._ino is not None else WATCH_POLL_MS
+
+    def poll(self):
+        if self._ino is not None:
+            return self._poll_inotify()
+        return self._poll_snapshot()
+
+    def close(self):
+        self._close_inotify()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _close_inotify(self):
+        if self._ino is not None:
+            self._ino.close()
+            self._ino = None
+
+    # ---------- inotify ----------
+
+    def _watch_all(self):
+        ino = self._ino
+        ino.add(self.root_path)
+        ino.add(os.path.dirname(self.config_path), _Inotify.IN_CLOSE_WRITE | _Inotify.IN_MOVED_TO | _Inotify.IN_CREATE)
+        for name, entry in index_workshop(self.root_path).items():
+            if name in self.mod_ids:
+                ino.add(entry.path)
+
+    def _poll_inotify(self):
+        changed = set()
+        config_changed = False
+        config_dir = os.path.dirname(self.config_path)
+        config_name = os.path.basename(self.config_path)
+        for folder, name, mask in self._ino.read():
+            if mask & _Inotify.IN_Q_OVERFLOW:
+                changed |= self.mod_ids  # 事件丢失，全部视为变化
+                config_changed = True
+                continue
+            if folder is None:
+                continue
+            if folder == self.root_path:
+                if name in self.mod_ids:
+                    changed.add(name)
+                    if mask & (_Inotify.IN_CREATE | _Inotify.IN_MOVED_TO):
+                        try:
+                            self._ino.add(os.path.join(folder, name))
+                        except OSError:
+                            pass
+            elif folder == config_dir and name == config_name:
+                config_changed = True
+            elif os.path.dirname(folder) == self.root_path:
+                mid = os.path.basename(folder)
+                if mid in self.mod_ids:
+                    changed.add(mid)
+        return changed, config_changed
+
+    # ---------- 轮询 ----------
+
+    def _take_snapshot(self):
+        """
+        {mod_id: (文件夹 mtime_ns, 信息文件签名)}，外加 usersettings.ini 的签名。
+        文件夹 mtime 只反映增删改名，原地改写的信息文件要单独 stat。
+        """
+        dirs = {}
+        try:
+            for name, entry in index_workshop(self.root_path).items():
+                m = self.mods.get(name)
+                if m is not None:
+                    try:
+                        dirs[name] = (entry.stat().st_mtime_ns, m.info_path and file_signature(m.info_path))
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+        return dirs, file_signature(self.config_path)
+
+    def _snapshot_diff(self):
+        """(后台线程) 取新快照并与上一次比较，返回 (变化的 mod_id 集合, usersettings.ini 是否变化)"""
+        new_dirs, new_cfg = new = self._take_snapshot()
+        old, self._snapshot = self._snapshot, new
+        if old is None:
+            return set(), False
+        old_dirs, old_cfg = old
+        changed = {mid for mid in old_dirs.keys() | new_dirs.keys() if old_dirs.get(mid) != new_dirs.get(mid)}
+        return changed, new_cfg != old_cfg
+
+    def _poll_snapshot(self):
+        """上一次后台比较完成时取走结果并开始下一次，否则本次没有变化"""
+        fut = self._pending
+        if fut is None or not fut.done() or self._pool is None:
+            return set(), False
+        self._pending = self._pool.submit(self._snapshot_diff)
+        try:
+            return fut.result()
+        except Exception as e:
+            print(f"Watcher poll failed: {e}")
+            return set(), False
+
+# ==========================================
+# 搜索索引
+# ==========================================
+SEARCH_DESC_CHARS = 2000  # 每种语言的描述只索引前这么多字符
+_CJK = '\u2e80-\u9fff\uac00-\ud7af\uf900-\ufaff'
+_TOKEN_RE = re.compile(f'[{_CJK}]+|[^\\W{_CJK}]+')
+
+def search_terms(text):
+    """
+    NFKC + casefold 归一化 (全角/半角、大小写不敏感) 后切分为 [(是否 CJK, 片段)]。
+    拉丁字母/数字按词切分，中日韩文字连续的一段作为一个片段。
+    """
+    text = unicodedata.normalize('NFKC', text).casefold()
+    return [(tok[0] >= '\u2e80', tok) for tok in _TOKEN_RE.findall(text)]
+
+def search_keys(text):
+    """生成索引键：拉丁词原样 (查询时做前缀匹配)，CJK 片段拆为相邻二字组，末字另作单字键"""
+    keys = set()
+    for cjk, tok in search_terms(text):
+        if cjk:
+            keys.update(tok[i:i + 2] for i in range(len(tok) - 1))
+            keys.add(tok[-1])
+        else:
+            keys.add(tok)
+    return keys
+
+class TokenIndex:
+    """倒排索引：键 -> mod_id 集合，另维护有序键列表以便 bisect 前缀查找；按模组增量更新"""
+    def __init__(self):
+        self.postings = {}
+        self.mod_keys = {}    # mod_id -> 该模组的键集合 (更新时求差集)
+        self._sorted = []
+        self._unsorted = []   # 新出现、尚未并入有序列表的键
+
+    def set(self, mod_id, keys):
+        old = self.mod_keys.get(mod_id, frozenset())
+        for k in old - keys:
+            p = self.postings[k]
+            p.discard(mod_id)
+            if not p:
+                self._drop_key(k)
+        for k in keys - old:
+            p = self.postings.get(k)
+            if p is None:
+                self.postings[k] = p = set()
+                self._unsorted.append(k)
+            p.add(mod_id)
+        if keys:
+            self.mod_keys[mod_id] = keys
+        else:
+            self.mod_keys.pop(mod_id, None)
+
+    def _drop_key(self, k):
+        """删除已没有任何模组的键 (同时从有序或待排序列表中移除)"""
+        del self.postings[k]
+        keys = self._sorted
+        i = bisect.bisect_left(keys, k)
+        if i < len(keys) and keys[i] == k:
+            del keys[i]
+        else:
+            self._unsorted.remove(k)
+
+    def exact(self, key):
+        return self.postings.get(key, frozenset())
+
+    def prefix(self, p):
+        keys = self._sorted_keys()
+        out = set()
+        i = bisect.bisect_left(keys, p)
+        while i < len(keys) and keys[i].startswith(p):
+            out |= self.postings[keys[i]]
+            i += 1
+        return out
+
+    def _sorted_keys(self):
+        if self._unsorted:
+            if len(self._unsorted) > 64:
+                self._sorted = sorted(self.postings)
+            else:
+                for k in self._unsorted:
+                    bisect.insort(self._sorted, k)
+            self._unsorted = []
+        return self._sorted
+
+class SearchIndex:
+    """
+    模组搜索：ID 与各语言名字同步建索引，描述由后台线程读取信息文件后补充。
+    sync()/update() 只更新有变化的模组，信息文件签名未变的描述不再重读。
+    """
+    def __init__(self):
+        self.names = TokenIndex()
+        self.descs = TokenIndex()
+        self._desc_sig = {}   # mod_id -> (info_path, (mtime_ns, size))
+        self._lock = threading.Lock()
+        self._gen = 0         # sync()/close() 时递增，使排队中与正在运行的旧描述任务失效
+        self._pool = None
+
+    def sync(self, mods):
+        """与整个列表同步 (读取/刷新完成后调用)"""
+        mods = list(mods)
+        live = {m.mod_id for m in mods}
+        with self._lock:
+            self._gen += 1
+            for idx in (self.names, self.descs):
+                for mid in [mid for mid in idx.mod_keys if mid not in live]:
+                    idx.set(mid, frozenset())
+            for mid in [mid for mid in self._desc_sig if mid not in live]:
+                del self._desc_sig[mid]
+            for m in mods:
+                self.names.set(m.mod_id, self._name_keys(m))
+        self._queue_descs(mods)
+
+    def update(self, mod):
+        """单个模组重新读取后调用"""
+        with self._lock:
+            self.names.set(mod.mod_id, self._name_keys(mod))
+        self._queue_descs([mod])
+
+    @staticmethod
+    def _name_keys(mod):
+        return search_keys(" ".join((mod.mod_id,) + mod.names[1::2]))
+
+    def _queue_descs(self, mods):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="SearchIndex")
+        self._pool.submit(self._index_descs, self._gen, [(m.mod_id, m.info_path) for m in mods])
+
+    def _index_descs(self, gen, items):
+        for mid, path in items:
+            if gen != self._gen:
+                return
+            sig = (path, file_signature(path)) if path else None
+            if self._desc_sig.get(mid) == sig:
+                continue
+            keys = frozenset()
+            if path:
+                try:
+                    descs = parse_info_file(path, INFO_DESC_KEY)
+                    keys = search_keys(" ".join(d[:SEARCH_DESC_CHARS] for d in descs.values()))
+                except Exception as e:
+                    print(f"Search index error {mid}: {e}")
+            with self._lock:
+                if gen == self._gen:
+                    self.descs.set(mid, keys)
+                    self._desc_sig[mid] = sig
+
+    def search(self, query):
+        """返回匹配所有查询词的 mod_id 集合；查询为空时返回 None"""
+        terms = search_terms(query)
+        if not terms:
+            return None
+        result = None
+        with self._lock:
+            for cjk, tok in terms:
+                if cjk and len(tok) > 1:
+                    # 二字组全部出现即视为命中 (不校验相邻)
+                    hit = None
+                    for i in range(len(tok) - 1):
+                        k = tok[i:i + 2]
+                        part = self.names.exact(k) | self.descs.exact(k)
+                        hit = part if hit is None else hit & part
+                        if not hit:
+                            break
+                else:
+                    hit = self.names.prefix(tok) | self.descs.prefix(tok)
+                result = hit if result is None else result & hit
+                if not result:
+                    return set()
+        return result
+
+    def wait(self):
+        """等待已排队的描述读取全部完成 (单线程按顺序执行，排一个空任务即可)"""
+        if self._pool is not None:
+            self._pool.submit(int).result()
+
+    def close(self, wait=False):
+        """停止后台读取描述：正在运行的任务在下一个模组前退出；wait 为 True 时等待其结束"""
+        with self._lock:
+            self._gen += 1
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
+
+# ==========================================
+# 增强型 Treeview
+# ==========================================
+class ReorderableTreeview(ttk.Treeview):
+    """
+    可拖拽排序的 Treeview。
+    - 拖动中的 <B1-Motion> 只记录坐标，每帧 (DRAG_FRAME_MS) 最多计算一次放置位置
+    - 放置位置为 (目标行, 是否放在其后)：指针在行的上半部为之前、下半部为之后
+    - 指示线只在放置位置变化时移动
+    - 指针靠近或超出上下边缘时自动滚动，越靠外、停留越久滚得越快
+    """
+    def __init__(self, master, **kw):
+        super().__init__(master, **kw)
+        self.bind("<Button-1>", self.on_click)
+        self.bind("<B1-Motion>", self.on_drag)
+        self.bind("<ButtonRelease-1>", self.on_drop)
+        self.drag_start_item = None
+        self.drag_items = ()      # 本次拖拽的行 (按下的行在多选中时为整个选中块)
+        self._keep_selection = None  # 在多选块内按下的行，松开时若未拖动改为只选中它
+        self.separator = None 
+        self.locked = False  # 后台扫描期间禁止拖拽
+        self.move_handler = None  # 设置后由外部数据模型处理拖拽 (src_items, dst_item, after)
+        self.scroll_handler = None  # 设置后自动滚动交给外部 (虚拟列表)，参数为滚动行数
+        self.selection_handler = None  # 设置后由外部给出完整选中项 (虚拟列表中含窗口外的行)
+        self.extend_select = False  # 最近一次按下时是否按住 Shift/Ctrl (追加选择)
+        self.drop_target = None   # (目标行, 是否放在其后)
+        self._drag_y = 0
+        self._drag_job = None
+        self._sep_y = None        # 指示线当前位置，None 为隐藏
+        self._scroll_since = None  # 开始自动滚动的时间
+
+    def create_separator(self):
+        if not self.separator:
+            self.separator = tk.Frame(self, height=2, bg="red")
+
+    def on_click(self, event):
+        self.create_separator()
+        item = self.identify_row(event.y)
+        self._keep_selection = None
+        self.extend_select = bool(event.state & 0x5)
+        if item:
+            sel = self.selection_handler() if self.selection_handler else self.selection()
+            if not self.locked:
+                self.drag_start_item = item
+                self.drag_items = sel if item in sel else (item,)
+            # 在多选块内按下 (无 Shift/Ctrl) 时先保留选中，以便拖动整块；松开时若未拖动再改为单选
+            if len(sel) > 1 and item in sel and not event.state & 0x5:
+                self._keep_selection = item
+                return "break"
+            self.event_generate("<<TreeviewSelect>>")
+
+    def on_drag(self, event):
+        if not self.drag_start_item: return
+        self._drag_y = event.y
+        if self._drag_job is None:
+            self._drag_job = self.after(DRAG_FRAME_MS, self._drag_frame)
+
+    def _drag_frame(self):
+        """每帧一次：必要时自动滚动，再更新放置位置；仍在边缘区域时继续定时滚动"""
+        self._drag_job = None
+        if not self.drag_start_item:
+            return
+        step = self._auto_scroll_step(self._drag_y)
+        if step:
+            if self.scroll_handler is not None:
+                self.scroll_handler(step)
+            else:
+                self.yview_scroll(step, "units")
+            self._drag_job = self.after(DRAG_SCROLL_MS, self._drag_frame)
+        self._update_drop(self._drag_y)
+
+    def _auto_scroll_step(self, y):
+        """边缘区域内返回本次滚动的行数 (向上为负)，否则为 0"""
+        h = self.winfo_height()
+        edge = min(DRAG_EDGE_PX, h // 4)
+        if y < edge:
+            depth, sign = edge - y, -1
+        elif y > h - edge:
+            depth, sign = y - (h - edge), 1
+        else:
+            self._scroll_since = None
+            return 0
+        now = time.monotonic()
+        if self._scroll_since is None:
+            self._scroll_since = now
+        rows = 1 + depth // max(1, edge) + int((now - self._scroll_since) * DRAG_SCROLL_ACCEL)
+        return sign * min(DRAG_SCROLL_MAX, rows)
+
+    def _update_drop(self, y):
+        """由指针位置计算 (目标行, 之后)；空白区域视为最后一个可见行之后"""
+        item = self.identify_row(y)
+        after = False
+        if item:
+            bbox = self.bbox(item)
+            if not bbox:
+                item = None
+            else:
+                after = y >= bbox[1] + bbox[3] / 2
+                line_y = bbox[1] + bbox[3] if after else bbox[1]
+        if not item:
+            children = self.get_children()
+            last = children[-1] if children else None
+            bbox = self.bbox(last) if last else None
+            if bbox and y > bbox[1]:
+                item, after, line_y = last, True, bbox[1] + bbox[3]
+        self.drop_target = (item, after) if item else None
+
+        # 目标在被拖动的块内时不显示指示线 (放下也不会移动)
+        line_y = line_y if item and item not in self.drag_items else None
+        if line_y != self._sep_y:
+            self._sep_y = line_y
+            if line_y is None:
+                self.separator.place_forget()
+            else:
+                self.separator.place(x=0, y=line_y - 1, relwidth=1.0, height=2)
+                self.separator.lift()
+
+    def _end_drag(self):
+        if self._drag_job is not None:
+            self.after_cancel(self._drag_job)
+            self._drag_job = None
+        self._scroll_since = None
+        self._sep_y = None
+        if self.separator:
+            self.separator.place_forget()
+
+    def on_drop(self, event):
+        start, items = self.drag_start_item, self.drag_items
+        if start:
+            self._update_drop(event.y)  # 以松开时的位置为准
+        target = self.drop_target
+        self._end_drag()
+        pressed, self._keep_selection = self._keep_selection, None
+        self.drag_start_item, self.drag_items, self.drop_target = None, (), None
+        target_item, after = target if target else (None, False)
+        if pressed and (target_item == pressed or not start):
+            self.selection_set(pressed)
+            return
+        if not start or not target_item: return
+        if target_item in items: return
+        
+        if self.move_handler:
+            self.move_handler(items, target_item, after)
+        else:
+            dst_index = self.index(target_item) + (1 if after else 0)
+            dst_index -= sum(1 for it in items if self.index(it) < dst_index)
+            for i, it in enumerate(items):
+                self.move(it, '', dst_index + i)
+
+# ==========================================
+# 缩略图缓存
+# ==========================================
+class ThumbnailCache:
+    """
+    详情面板缩略图。
+    - 内存：PhotoImage 的 LRU，按像素字节数限制总量
+    - 磁盘：ThumbCache/ 下预先缩放好的 JPG，以源文件路径 + mtime + size 为键
+    - 预读：后台线程提前生成相邻行的缩略图 (PhotoImage 只能在主线程创建，后台只准备 PIL 图像)
+    """
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lru = OrderedDict()   # key -> (PhotoImage, 字节数)
+        self._bytes = 0
+        self._ready = {}            # key -> 后台已缩放好的 PIL 图像
+        self._inflight = set()
+        self._lock = threading.Lock()
+        self._pool = None  # 第一次用到时才创建线程池并整理磁盘缓存
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="Thumb")
+            self._pool.submit(self._trim_disk)
+        return self._pool
+
+    @staticmethod
+    def _key(path):
+        TRACE.count("stat")
+        st = os.stat(path)
+        return f"{os.path.normcase(os.path.abspath(path))}|{st.st_mtime_ns}|{st.st_size}"
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode('utf-8')).hexdigest() + ".jpg")
+
+    @staticmethod
+    def fit_size(w, h):
+        """宽度先撑满 380，高度超过 300 时再按高度缩放 (与原详情面板逻辑一致)"""
+        bw, max_h = THUMB_SIZE
+        hs = int(h * (bw / float(w)))
+        if hs > max_h:
+            hs = max_h
+            bw = int(w * (hs / float(h)))
+        return max(1, bw), max(1, hs)
+
+    def _make_thumb(self, path, key):
+        """读取磁盘缓存，未命中则缩放源图并写入磁盘 (任意线程可调用)"""
+        _load_pil()
+        disk = self._disk_path(key)
+        try:
+            img = Image.open(disk)
+            img.load()
+            TRACE.count("thumb_disk_hit")
+            return img
+        except OSError:
+            pass
+
+        TRACE.count("decode")
+        with TRACE.span("decode_image"):
+            return self._scale(path, disk)
+
+    def _scale(self, path, disk):
+        """解码并缩放源图，同时写入磁盘缓存"""
+        img = Image.open(path)
+        size = self.fit_size(*img.size)
+        if img.format == "JPEG":
+            img.draft("RGB", size)  # 让 JPEG 解码器直接按 1/2、1/4、1/8 缩小解码
+        if img.mode in ("RGBA", "LA", "P"):
+            img = img.convert("RGBA")
+            bg = Image.new("RGB", img.size, "#eeeeee")
+            bg.paste(img, mask=img.split()[-1])
+            img = bg
+        elif img.mode != "RGB":
+            img = img.convert("RGB")
+        img = img.resize(size, Image.Resampling.LANCZOS)
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = f"{disk}.{threading.get_ident()}.tmp"
+            img.save(tmp, "JPEG", quality=90)
+            os.replace(tmp, disk)
+        except OSError as e:
+            print(f"Thumbnail cache write failed: {e}")
+        return img
+
+    @TRACE.wrap("thumbnail")
+    def get(self, path):
+        """返回可直接显示的 PhotoImage (主线程调用)"""
+        key = self._key(path)
+        hit = self._lru.get(key)
+        if hit is not None:
+            self._lru.move_to_end(key)
+            return hit[0]
+
+        with self._lock:
+            img = self._ready.pop(key, None)
+        if img is None:
+            img = self._make_thumb(path, key)
+        _load_pil()
+        photo = ImageTk.PhotoImage(img)
+        self._remember(key, photo, img.size[0] * img.size[1] * 4)
+        return photo
+
+    def _remember(self, key, photo, nbytes):
+        self._lru[key] = (photo, nbytes)
+        self._bytes += nbytes
+        while self._bytes > self.max_bytes and len(self._lru) > 1:
+            _, (_, old) = self._lru.popitem(last=False)
+            self._bytes -= old
+
+    def prefetch(self, paths):
+        """后台预先生成缩略图，之后 get 时只需创建 PhotoImage"""
+        if not paths:
+            return
+        pool = self._executor()
+        for path in paths:
+            pool.submit(self._prefetch_one, path)
+
+    def _prefetch_one(self, path):
+        try:
+            key = self._key(path)
+        except Exception:
+            return
+        with self._lock:
+            if key in self._ready or key in self._inflight or key in self._lru:
+                return
+            self._inflight.add(key)
+        try:
+            img = self._make_thumb(path, key)
+            with self._lock:
+                self._ready[key] = img
+                # 只保留最近预读的几张，避免未被查看的图像堆积
+                while len(self._ready) > THUMB_PREFETCH_RADIUS * 4:
+                    self._ready.pop(next(iter(self._ready)))
+        except Exception:
+            pass
+        finally:
+            # 失败时也要移除，否则这张图再也不会被预读
+            with self._lock:
+                self._inflight.discard(key)
+
+    def _trim_disk(self):
+        """磁盘缓存超过上限时删除最旧的缩略图"""
+        try:
+            with os.scandir(self.cache_dir) as it:
+                files = [(e.stat().st_mtime, e.path) for e in it if e.name.endswith(".jpg")]
+        except OSError:
+            return
+        if len(files) <= THUMB_DISK_MAX_FILES:
+            return
+        files.sort()
+        for _, p in files[:len(files) - THUMB_DISK_MAX_FILES]:
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+# ==========================================
+# 预设选择窗口
+# ==========================================
+class PresetDialog:
+    """左侧为 PresetLibrary 索引中的预设，右侧预览应用到当前列表的差异"""
+    PREVIEW_NAMES = 15  # 每类改动最多列出的模组数
+
+    def __init__(self, app):
+        self.app = app
+        self.library = app.presets
+        self.data = None
+        l = app.ui_text
+        f = app.main_font
+
+        self.win = tk.Toplevel(app.root)
+        self.win.title(l["load_preset"])
+        self.win.geometry("820x480")
+        self.win.transient(app.root)
+
+        btns = tk.Frame(self.win)
+        btns.pack(side="bottom", fill="x", padx=10, pady=10)
+        tk.Button(btns, text=l["preset_browse"], command=self._browse, font=f).pack(side="left")
+        tk.Button(btns, text=l["cancel"], command=self.win.destroy, font=f).pack(side="right", padx=5)
+        tk.Button(btns, text=l["preset_apply_save"], command=lambda: self._apply(True), bg="#a5d6a7", font=f).pack(side="right", padx=5)
+        tk.Button(btns, text=l["preset_apply"], command=lambda: self._apply(False), font=f).pack(side="right", padx=5)
+
+        self.lst = tk.Listbox(self.win, font=f, width=40, exportselection=False)
+        self.lst.pack(side="left", fill="y", padx=(10, 5), pady=(10, 0))
+        self.txt = tk.Text(self.win, wrap="word", font=f, bg="#f9f9f9", bd=0)
+        self.txt.pack(side="left", fill="both", expand=True, padx=(5, 10), pady=(10, 0))
+
+        # 列表只读索引，签名未变的预设不解析
+        self.names = []
+        for name, ent in self.library.scan():
+            stamp = time.strftime("%Y-%m-%d %H:%M", time.localtime(ent["sig"][0] / 1e9))
+            self.lst.insert("end", f"{os.path.splitext(name)[0]}  ({ent['enabled']}/{ent['count']})  {stamp}")
+            self.names.append(name)
+        self.lst.bind("<<ListboxSelect>>", self._on_select)
+        self.lst.bind("<Double-1>", lambda e: self._apply(False))
+        self.win.grab_set()
+
+    def _on_select(self, event):
+        sel = self.lst.curselection()
+        if not sel: return
+        name = self.names[sel[0]]
+        try:
+            self._preview(self.library.load(name), name)
+        except (OSError, ValueError) as e:
+            self.data = None
+            self._show(f"{name}\n\n{e}")
+
+    def _browse(self):
+        fn = filedialog.askopenfilename(parent=self.win, initialdir=self.library.folder, filetypes=[("JSON", "*.json")])
+        if not fn: return
+        try:
+            with open(fn, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._preview(data, os.path.basename(fn))
+        except (OSError, ValueError, AttributeError, TypeError) as e:
+            messagebox.showerror(self.app.ui_text["msg_error"], str(e), parent=self.win)
+
+    def _preview(self, data, label):
+        app = self.app
+        l = app.ui_text
+        diff = diff_preset(app.model, data)
+        self.data = data
+        lines = [label, l["preset_summary"].format(len(diff.moves), len(diff.enable), len(diff.disable), len(diff.missing))]
+        if not diff.changed:
+            lines.append(l["preset_nochange"])
+        for title, ids in zip(l["preset_sections"], (diff.enable, diff.disable, diff.moves)):
+            if ids:
+                lines.append(f"\n{title}:")
+                lines += [f"  {app.model.get(mid).get_display_name(app.current_lang)} ({mid})" for mid in ids[:self.PREVIEW_NAMES]]
+                if len(ids) > self.PREVIEW_NAMES:
+                    lines.append(l["preset_more"].format(len(ids) - self.PREVIEW_NAMES))
+        if diff.missing:
+            lines.append(f"\n{l['preset_sections'][3]}:")
+            lines += [f"  {desc}" for desc in diff.missing[:self.PREVIEW_NAMES]]
+            if len(diff.missing) > self.PREVIEW_NAMES:
+                lines.append(l["preset_more"].format(len(diff.missing) - self.PREVIEW_NAMES))
+        self._show("\n".join(lines))
+
+    def _show(self, text):
+        self.txt.config(state="normal")
+        self.txt.delete(1.0, "end")
+        self.txt.insert("end", text)
+        self.txt.config(state="disabled")
+
+    def _apply(self, save):
+        if self.data is None: return
+        data = self.data
+        self.win.destroy()
+        self.app.apply_preset_data(data, save)
+
+# ==========================================
+# 冲突分析结果窗口
+# ==========================================
+class ConflictDialog:
+    """显示 ConflictReport，可一键应用按依赖提示排序后的顺序"""
+    MAX_LINES = 40  # 每一类最多列出的条目
+
+    def __init__(self, app, report):
+        self.app = app
+        self.report = report
+        l = app.ui_text
+        f = app.main_font
+
+        self.win = tk.Toplevel(app.root)
+        self.win.title(l["check_conflicts"])
+        self.win.geometry("820x520")
+        self.win.transient(app.root)
+
+        btns = tk.Frame(self.win)
+        btns.pack(side="bottom", fill="x", padx=10, pady=10)
+        tk.Button(btns, text=l["close"], command=self.win.destroy, font=f).pack(side="right", padx=5)
+        self.order, cyclic = report.suggested_order(app.model)
+        moves = len(moved_ids(app.model, self.order))
+        btn_apply = tk.Button(btns, text=l["conflict_apply"], command=self._apply, bg="#a5d6a7", font=f)
+        btn_apply.pack(side="right", padx=5)
+        if not moves:
+            btn_apply.config(state="disabled")
+
+        txt = tk.Text(self.win, wrap="word", font=f, bg="#f9f9f9", bd=0)
+        txt.pack(fill="both", expand=True, padx=10, pady=(10, 0))
+        txt.insert("end", "\n".join(self._lines(moves, cyclic)))
+        txt.config(state="disabled")
+
+    def _name(self, mid):
+        m = self.app.model.get(mid)
+        return f"{m.get_display_name(self.app.current_lang)} ({mid})" if m else mid
+
+    def _section(self, title, items):
+        if not items:
+            return []
+        out = ["", title] + items[:self.MAX_LINES]
+        if len(items) > self.MAX_LINES:
+            out.append(self.app.ui_text["preset_more"].format(len(items) - self.MAX_LINES))
+        return out
+
+    def _lines(self, moves, cyclic):
+        l = self.app.ui_text
+        r = self.report
+        lines = [l["conflict_summary"].format(r.file_count, len(r.overlaps)) if r.overlaps else l["conflict_none"]]
+        pairs = sorted(r.pairs.items(), key=lambda kv: -kv[1][0])
+        lines += self._section(l["conflict_overrides"], [
+            l["conflict_override_line"].format(self._name(winner), self._name(loser), n, example)
+            for (loser, winner), (n, example) in pairs])
+        lines += self._section(l["conflict_order"], [
+            l["conflict_order_line"].format(self._name(b), self._name(a)) for a, b in r.violations(self.app.model)])
+        lines += self._section(l["conflict_missing"], [
+            l["conflict_missing_line"].format(self._name(mid), self._name(dep)) for mid, dep in r.missing_deps])
+        lines += self._section(l["conflict_cycles"], [f"  {self._name(mid)}" for mid in cyclic])
+        lines += ["", l["conflict_sort"].format(moves) if moves else l["conflict_sorted"]]
+        return lines
+
+    def _apply(self):
+        self.win.destroy()
+        self.app.apply_order(self.report)
+
+# ==========================================
+# 主应用程序
+# ==========================================
+class ModManagerApp:
+    def __init__(self, root):
+        self.root = root
+        self.current_lang = "cn" 
+        self.ui_text = UI_LANG_DATA[self.current_lang]
+        
+        self.root.title(self.ui_text["title"])
+        self.root.geometry("1200x850")
+
+        self.app_dir = get_app_path()
+        self.config_json_path = os.path.join(self.app_dir, APP_CONFIG_FILE)
+        self.preset_root = os.path.join(self.app_dir, PRESET_DIR)
+        self.presets = PresetLibrary(self.preset_root, os.path.join(self.app_dir, PRESET_INDEX_FILE))
+
+        self.config_path = tk.StringVar()
+        self.mod_root_path = tk.StringVar()
+        self.font_size = tk.IntVar(value=10)
+        self.selected_lang_var = tk.StringVar(value="中文")
+        self.scan_workers = DEFAULT_SCAN_WORKERS
+        self.thumb_cache_mb = DEFAULT_THUMB_CACHE_MB
+        self.virtual_threshold = DEFAULT_VIRTUAL_THRESHOLD
+        self.backup_count = DEFAULT_BACKUP_COUNT
+        self.hash_workers = DEFAULT_HASH_WORKERS
+        self.watch_var = tk.BooleanVar(value=True)
+        
+        self.model = ModListModel()
+        self.view = self.model    # 当前显示的列表：无筛选时即模型本身，否则为 ModListView
+        self.search = SearchIndex()
+        self.search_var = tk.StringVar()
+        self.state_filter = 0     # 0 全部 / 1 已启用 / 2 已禁用
+        self._filter_job = None
+        self.profile = DEFAULT_PROFILE
+        self.profiles = {}        # 方案名 -> {"config_path", "mod_root_path"}
+        self.profile_var = tk.StringVar()
+        self.profile_dir = None   # 当前方案的缓存目录，缓存对象由 _bind_profile_caches 创建
+        self.dup_notes = {}       # mod_id -> 查重结果说明，有说明的行标为 "dup"
+        self.manifest = None      # Steam 创意工坊清单 (WorkshopManifest)，有可用更新的行标为 "outdated"
+        self._hashing = False
+        self.totals = EnabledTotals()
+        self._sizing = 0          # 体积统计批次号，过期批次的结果丢弃
+        self._sizes_pending = False
+        self._jobs = None         # 冲突分析等后台任务的单线程池
+        self._cancel = CancelEvent()  # 关闭窗口时置位，正在运行的后台任务在下一个模组前停止
+        self._analyzing = False
+        self.scan = None        # 正在进行的 WorkshopScan
+        self._scan_rows = []    # 扫描期间已插入 Treeview 的模型序号 (有序)
+        self._scan_silent = True
+        self._scan_prefilled = False  # 扫描前是否已按元数据缓存显示了全部行
+        self._load_issues = 0     # 最近一次读取时 [LoadOrder] 中跳过的异常行数
+        self._row_cache = {}    # iid(mod_id) -> 当前显示的 (values, tags)，避免回读控件
+        self._virtual = False   # 是否处于虚拟列表模式 (只创建可见行)
+        self._view_offset = 0   # 虚拟模式下窗口第一行在模型中的序号
+        self._selected_id = None
+        self._selection = set()  # 选中的 mod_id；虚拟模式下窗口外的行不在控件里，由此保留
+        self.watcher = None       # WorkshopWatcher，加载完成后启动
+        self._watch_job = None
+        self._watch_pending = set()
+        self._watch_config = False
+        self._watch_last = 0.0    # 最近一次检测到变化的时间
+        self._config_sig = None   # 最近一次读取/保存后 usersettings.ini 的 (mtime_ns, size)
+        self._saved_order = ()    # 同上时刻的加载顺序，用于判断是否有未保存的改动
+        
+        self.main_font = font.Font(family="Microsoft YaHei", size=10)
+        self.bold_font = font.Font(family="Microsoft YaHei", size=10, weight="bold")
+
+        self.load_app_config()
+        self._bind_profile_caches()
+        self.thumbs = ThumbnailCache(os.path.join(self.app_dir, THUMB_DIR), self.thumb_cache_mb * 1024 * 1024)
+        self._init_ui()
+        self.update_ui_text() 
+        STARTUP.mark("build ui")
+
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # 先让窗口显示出来，首帧绘制后再读取模组列表
+        self.root.after(1, self._after_first_paint)
+
+    def _after_first_paint(self):
+        self.root.update_idletasks()
+        STARTUP.mark("first paint")
+        if self.config_path.get() and self.mod_root_path.get():
+            self.load_data(silent=True)
+        if self.scan is None:
+            STARTUP.report()
+
+    def on_close(self):
+        if self.scan is not None:
+            self.scan.cancel()
+        self._stop_watcher()
+        self.search.close()
+        self._cancel.set()
+        if self._jobs is not None:
+            self._jobs.shutdown(wait=False, cancel_futures=True)
+        self.thumbs.close()
+        self.root.destroy()
+
+    def _init_ui(self):
+        style = ttk.Style()
+        style.configure("Treeview", font=self.main_font)
+        style.configure("Treeview.Heading", font=self.bold_font)
+
+        # --- Top Frame ---
+        self.top_frame = tk.LabelFrame(self.root, padx=10, pady=10)
+        self.top_frame.pack(fill="x", padx=10, pady=5)
+
+        self.lbl_cfg = tk.Label(self.top_frame, font=self.main_font)
+        self.lbl_cfg.grid(row=0, column=0, sticky="e")
+        tk.Entry(self.top_frame, textvariable=self.config_path, width=60, font=self.main_font).grid(row=0, column=1, padx=5)
+        self.btn_browse_cfg = tk.Button(self.top_frame, command=self.browse_config, font=self.main_font)
+        self.btn_browse_cfg.grid(row=0, column=2)
+
+        self.lbl_mod = tk.Label(self.top_frame, font=self.main_font)
+        self.lbl_mod.grid(row=1, column=0, sticky="e")
+        tk.Entry(self.top_frame, textvariable=self.mod_root_path, width=60, font=self.main_font).grid(row=1, column=1, padx=5)
+        self.btn_browse_mod = tk.Button(self.top_frame, command=self.browse_mod_dir, font=self.main_font)
+        self.btn_browse_mod.grid(row=1, column=2)
+
+        # 配置方案：每个方案有自己的路径、缓存与上次的加载顺序
+        profile_frame = tk.Frame(self.top_frame)
+        profile_frame.grid(row=0, column=3, rowspan=2, padx=(20, 0), sticky="n")
+        self.lbl_profile = tk.Label(profile_frame, font=self.main_font)
+        self.lbl_profile.grid(row=0, column=0, columnspan=2, sticky="w")
+        self.cb_profile = ttk.Combobox(profile_frame, textvariable=self.profile_var, width=16, state="readonly", font=self.main_font)
+        self.cb_profile.grid(row=1, column=0, columnspan=2, pady=2)
+        self.cb_profile.bind("<<ComboboxSelected>>", self._on_profile_selected)
+        self.btn_new_profile = tk.Button(profile_frame, command=self.new_profile, font=self.main_font)
+        self.btn_new_profile.grid(row=2, column=0, sticky="ew")
+        self.btn_del_profile = tk.Button(profile_frame, command=self.delete_profile, font=self.main_font)
+        self.btn_del_profile.grid(row=2, column=1, sticky="ew")
+
+        # Button Frame
+        btn_frame = tk.Frame(self.top_frame)
+        btn_frame.grid(row=2, column=0, columnspan=3, pady=10, sticky="w")
+        
+        self.btn_load = tk.Button(btn_frame, command=lambda: self.load_data(False), bg="#e1f5fe", font=self.bold_font)
+        self.btn_load.pack(side="left", padx=5)
+        
+        self.btn_save = tk.Button(btn_frame, command=self.save_game_config, bg="#a5d6a7", font=self.bold_font)
+        self.btn_save.pack(side="left", padx=5)
+
+        # 扫描进度 (仅扫描期间显示)
+        self.progress = ttk.Progressbar(btn_frame, length=160, mode="determinate")
+        self.lbl_progress = tk.Label(btn_frame, font=self.main_font)
+
+        # Settings
+        tk.Label(btn_frame, text="|").pack(side="left", padx=5)
+        self.lbl_font = tk.Label(btn_frame, font=self.main_font)
+        self.lbl_font.pack(side="left")
+        tk.Spinbox(btn_frame, from_=8, to=30, textvariable=self.font_size, width=3, command=self.update_font, font=self.main_font).pack(side="left")
+
+        tk.Label(btn_frame, text="|").pack(side="left", padx=5)
+        self.lbl_lang = tk.Label(btn_frame, font=self.main_font)
+        self.lbl_lang.pack(side="left")
+        
+        lang_cb = ttk.Combobox(btn_frame, textvariable=self.selected_lang_var, values=["中文", "English"], width=8, state="readonly", font=self.main_font)
+        lang_cb.pack(side="left")
+        lang_cb.bind("<<ComboboxSelected>>", self.change_language)
+
+        tk.Label(btn_frame, text="|").pack(side="left", padx=5)
+        self.chk_watch = tk.Checkbutton(btn_frame, variable=self.watch_var, command=self._on_watch_toggle, font=self.main_font)
+        self.chk_watch.pack(side="left")
+
+        self.btn_save_preset = tk.Button(btn_frame, command=self.save_preset, font=self.main_font)
+        self.btn_save_preset.pack(side="right", padx=5)
+        self.btn_load_preset = tk.Button(btn_frame, command=self.load_preset, font=self.main_font)
+        self.btn_load_preset.pack(side="right", padx=5)
+        self.btn_conflicts = tk.Button(btn_frame, command=self.check_conflicts, font=self.main_font)
+        self.btn_conflicts.pack(side="right", padx=5)
+        self.btn_dups = tk.Button(btn_frame, command=self.check_duplicates, font=self.main_font)
+        self.btn_dups.pack(side="right", padx=5)
+
+        # --- 调试状态栏 (--trace) ---
+        if TRACE.enabled:
+            trace_frame = tk.Frame(self.root, bd=1, relief="sunken")
+            trace_frame.pack(side="bottom", fill="x")
+            self.btn_trace_dump = tk.Button(trace_frame, command=self.dump_trace, font=self.main_font)
+            self.btn_trace_dump.pack(side="right")
+            self.lbl_trace = tk.Label(trace_frame, font=self.main_font, anchor="w", justify="left")
+            self.lbl_trace.pack(side="left", fill="x", expand=True)
+            TRACE.listener = self._on_trace_op
+
+        # --- Mid Frame ---
+        mid_frame = tk.Frame(self.root)
+        mid_frame.pack(fill="both", expand=True, padx=10, pady=5)
+
+        self.list_frame = tk.LabelFrame(mid_frame)
+        self.list_frame.pack(side="left", fill="both", expand=True, padx=(0, 5))
+
+        # 搜索框与启用状态筛选
+        search_frame = tk.Frame(self.list_frame)
+        search_frame.pack(side="top", fill="x", pady=(0, 5))
+        self.lbl_search = tk.Label(search_frame, font=self.main_font)
+        self.lbl_search.pack(side="left")
+        tk.Entry(search_frame, textvariable=self.search_var, font=self.main_font).pack(side="left", fill="x", expand=True, padx=5)
+        self.search_var.trace_add("write", lambda *a: self._schedule_filter())
+        self.cb_state = ttk.Combobox(search_frame, width=8, state="readonly", font=self.main_font)
+        self.cb_state.pack(side="left")
+        self.cb_state.bind("<<ComboboxSelected>>", self._on_state_filter)
+
+        self.tree = ReorderableTreeview(self.list_frame, columns=("enabled", "name", "id", "size"), show="headings", selectmode="extended")
+        self.tree.column("enabled", width=80, anchor="center")
+        self.tree.column("name", width=300)
+        self.tree.column("id", width=100)
+        self.tree.column("size", width=80, anchor="e")
+
+        # 已启用模组的合计
+        self.lbl_totals = tk.Label(self.list_frame, font=self.main_font, anchor="w")
+        self.lbl_totals.pack(side="bottom", fill="x")
+        
+        # 滚动条经由 _on_scrollbar 转发，虚拟模式下改为移动窗口
+        self.scrollbar = ttk.Scrollbar(self.list_frame, orient="vertical", command=self._on_scrollbar)
+        self.tree.configure(yscroll=self._on_tree_yscroll)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        self.tree.tag_configure("dup", background="#ffe0b2")
+        self.tree.tag_configure("outdated", background="#e3f2fd")
+        self.tree.bind("<Double-1>", self.toggle_mod)
+        self.tree.bind("<space>", lambda e: self.toggle_selected() or "break")
+        self.tree.bind("<Button-3>", self._on_row_menu)
+
+        # 右键菜单：对所有选中行批量操作
+        self.row_menu = tk.Menu(self.tree, tearoff=0)
+        self.row_menu.add_command(command=lambda: self.set_selected_enabled(True))
+        self.row_menu.add_command(command=lambda: self.set_selected_enabled(False))
+        self.row_menu.add_separator()
+        self.row_menu.add_command(command=lambda: self.move_selected(top=True))
+        self.row_menu.add_command(command=lambda: self.move_selected(top=False))
+        self.row_menu.add_separator()
+        self.row_menu.add_command(command=lambda: self.measure_sizes(self._selected_ids(), stat_files=True))
+        self.tree.bind("<<TreeviewSelect>>", self._on_tree_select)
+        self.tree.move_handler = self._on_tree_move
+        self.tree.selection_handler = self._selected_ids
+        self.tree.scroll_handler = self._on_drag_scroll
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(seq, self._on_wheel)
+        for seq in ("<Up>", "<Down>", "<Prior>", "<Next>"):
+            self.tree.bind(seq, self._on_key_scroll)
+        self.tree.bind("<Configure>", lambda e: self._virtual and self._render_window())
+
+        self.detail_frame = tk.LabelFrame(mid_frame, width=400)
+        self.detail_frame.pack(side="right", fill="both", padx=(5, 0))
+        self.detail_frame.pack_propagate(False)
+
+        self.img_label = tk.Label(self.detail_frame, bg="#eeeeee")
+        self.img_label.pack(fill="x", padx=5, pady=5, ipady=20)
+
+        self.lbl_mod_name = tk.Label(self.detail_frame, font=self.bold_font, wraplength=380)
+        self.lbl_mod_name.pack(pady=5)
+
+        self.lbl_mod_size = tk.Label(self.detail_frame, font=self.main_font, wraplength=380, justify="left")
+        self.lbl_mod_size.pack()
+
+        self.txt_desc = tk.Text(self.detail_frame, wrap="word", font=self.main_font, bg="#f9f9f9", bd=0)
+        self.txt_desc.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        self.update_font()
+
+    # ================= UI Logic =================
+
+    def update_ui_text(self):
+        l = self.ui_text
+        self.root.title(l["title"])
+        self.top_frame.config(text=l["path_settings"])
+        self.lbl_cfg.config(text=l["game_config"])
+        self.lbl_mod.config(text=l["mod_dir"])
+        self.btn_browse_cfg.config(text=l["browse"])
+        self.btn_browse_mod.config(text=l["browse"])
+        self.lbl_profile.config(text=l["profile"])
+        self.btn_new_profile.config(text=l["new_profile"])
+        self.btn_del_profile.config(text=l["del_profile"])
+        self._update_profile_box()
+        self.btn_load.config(text=l["cancel_scan"] if self.scan else l["load_refresh"])
+        self.btn_save.config(text=l["save_config"])
+        self.chk_watch.config(text=l["watch_changes"])
+        self.lbl_search.config(text=l["search"])
+        self.cb_state.config(values=l["filter_states"])
+        self.cb_state.current(self.state_filter)
+        for i, key in ((0, "menu_enable"), (1, "menu_disable"), (3, "menu_top"), (4, "menu_bottom"), (6, "menu_refresh_sizes")):
+            self.row_menu.entryconfig(i, label=l[key])
+        self.lbl_font.config(text=l["font_size"])
+        self.lbl_lang.config(text=l["language"])
+        self.btn_save_preset.config(text=l["save_preset"])
+        self.btn_load_preset.config(text=l["load_preset"])
+        self.btn_conflicts.config(text=l["conflict_running"] if self._analyzing else l["check_conflicts"])
+        self.btn_dups.config(text=l["dup_running"] if self._hashing else l["check_dups"])
+        if TRACE.enabled:
+            self.btn_trace_dump.config(text=l["trace_dump"])
+            if TRACE.last is None:
+                self.lbl_trace.config(text=l["trace_idle"])
+        
+        self.list_frame.config(text=l["mod_list_title"])
+        self.tree.heading("enabled", text=l["col_status"])
+        self.tree.heading("name", text=l["col_name"])
+        self.tree.heading("id", text=l["col_id"])
+        self.tree.heading("size", text=l["col_size"])
+        self._update_totals()
+        
+        self.detail_frame.config(text=l["mod_details"])
+        self.img_label.config(text=l["no_image"])
+        
+        # 刷新内容以适应新语言
+        self.refresh_list()
+        # 如果有选中的模组，刷新详情
+        sel = self.tree.selection()
+        if sel:
+            self.show_details(None)
+
+    def change_language(self, event):
+        sel = self.selected_lang_var.get()
+        self.current_lang = "cn" if sel == "中文" else "en"
+        self.ui_text = UI_LANG_DATA[self.current_lang]
+        self.update_ui_text()
+        self.save_app_config()
+
+    def update_font(self):
+        s = self.font_size.get()
+        self.main_font.configure(size=s)
+        self.bold_font.configure(size=s, weight="bold")
+        ttk.Style().configure("Treeview", rowheight=int(s * 2.5))
+
+    def load_app_config(self):
+        if os.path.exists(self.config_json_path):
+            try:
+                with open(self.config_json_path, 'r', encoding='utf-8') as f:
+                    d = json.load(f)
+                    self.config_path.set(d.get("config_path", ""))
+                    self.mod_root_path.set(d.get("mod_root_path", ""))
+                    self.font_size.set(d.get("font_size", 10))
+                    self.current_lang = d.get("lang", "cn")
+                    self.scan_workers = max(1, int(d.get("scan_workers", DEFAULT_SCAN_WORKERS)))
+                    self.thumb_cache_mb = max(1, int(d.get("thumb_cache_mb", DEFAULT_THUMB_CACHE_MB)))
+                    self.virtual_threshold = max(100, int(d.get("virtual_threshold", DEFAULT_VIRTUAL_THRESHOLD)))
+                    self.backup_count = max(0, int(d.get("backup_count", DEFAULT_BACKUP_COUNT)))
+                    self.hash_workers = max(1, int(d.get("hash_workers", DEFAULT_HASH_WORKERS)))
+                    self.watch_var.set(bool(d.get("watch_changes", True)))
+                    self.profile = str(d.get("profile", DEFAULT_PROFILE))
+                    self.profiles = {str(k): dict(v) for k, v in d.get("profiles", {}).items()}
+                    self.selected_lang_var.set("中文" if self.current_lang == "cn" else "English")
+                    self.ui_text = UI_LANG_DATA[self.current_lang]
+            except: pass
+        # 顶层路径即当前方案的路径 (旧版配置文件没有 profiles)
+        self.profiles.setdefault(self.profile, {"config_path": self.config_path.get(), "mod_root_path": self.mod_root_path.get()})
+        self.profiles.setdefault(DEFAULT_PROFILE, {"config_path": "", "mod_root_path": ""})
+
+    def save_app_config(self):
+        self.profiles[self.profile] = {"config_path": self.config_path.get(), "mod_root_path": self.mod_root_path.get()}
+        d = {
+            "config_path": self.config_path.get(),
+            "mod_root_path": self.mod_root_path.get(),
+            "font_size": self.font_size.get(),
+            "lang": self.current_lang,
+            "scan_workers": self.scan_workers,
+            "thumb_cache_mb": self.thumb_cache_mb,
+            "virtual_threshold": self.virtual_threshold,
+            "backup_count": self.backup_count,
+            "hash_workers": self.hash_workers,
+            "watch_changes": self.watch_var.get(),
+            "profile": self.profile,
+            "profiles": self.profiles
+        }
+        with open(self.config_json_path, 'w', encoding='utf-8') as f:
+            json.dump(d, f, indent=4)
+
+    # ---------- 配置方案 ----------
+
+    def _bind_profile_caches(self):
+        """元数据/文件列表/摘要缓存与上次的加载顺序按方案分开保存"""
+        d = profile_cache_dir(self.app_dir, self.profile)
+        try:
+            os.makedirs(d, exist_ok=True)
+        except OSError as e:
+            print(f"Profile cache dir not created: {e}")
+        self.profile_dir = d
+        self.meta_cache = MetaCache(os.path.join(d, META_CACHE_FILE))
+        self.file_cache = FileTreeCache(os.path.join(d, FILE_CACHE_FILE))
+        self.hash_cache = HashCache(os.path.join(d, HASH_CACHE_FILE))
+
+    def _update_profile_box(self):
+        names = sorted(self.profiles, key=lambda n: (n != DEFAULT_PROFILE, n.casefold()))
+        self.cb_profile.config(values=names)
+        self.profile_var.set(self.profile)
+        self.btn_del_profile.config(state="disabled" if self.profile == DEFAULT_PROFILE else "normal")
+
+    def _on_profile_selected(self, event):
+        name = self.profile_var.get()
+        if not self.switch_profile(name):
+            self.profile_var.set(self.profile)
+
+    def switch_profile(self, name):
+        """
+        切换配置方案：先用该方案上次的加载顺序与元数据缓存立即显示列表，
+        再后台重新读取 usersettings.ini 并只重新解析有变化的模组文件夹。
+        """
+        if name not in self.profiles or name == self.profile:
+            return False
+        if len(self.model) and self._order_snapshot() != self._saved_order and \
+                not messagebox.askyesno(self.ui_text["msg_confirm"], self.ui_text["msg_profile_unsaved"]):
+            return False
+        if self.scan is not None:
+            self.cancel_scan(notify=False)
+        self._stop_watcher()
+        self.meta_cache.save()
+
+        self.profile = name
+        p = self.profiles[name]
+        self.config_path.set(p.get("config_path", ""))
+        self.mod_root_path.set(p.get("mod_root_path", ""))
+        self.save_app_config()
+        self._bind_profile_caches()
+        self.dup_notes = {}
+        self.manifest = None
+        self.totals = EnabledTotals()
+        self._update_profile_box()
+        self._restore_last_order()
+        self.load_data(silent=True)
+        return True
+
+    def _restore_last_order(self):
+        """按 LastLoadOrder.json 与元数据缓存显示列表，不访问模组文件夹"""
+        mods = load_last_order(os.path.join(self.profile_dir, LAST_ORDER_FILE)) or []
+        self.model.set_mods(mods)
+        mp = self.mod_root_path.get()
+        if mods and mp:
+            self.meta_cache.open(mp)
+            for m in self.model:
+                self.meta_cache.peek(m)
+        self._view_offset = 0
+        self.search.sync(self.model)
+        self.totals.reset(self.model)
+        self._update_totals()
+        self.refresh_list()
+        self._config_sig = file_signature(self.config_path.get())
+        self._saved_order = self._order_snapshot()
+
+    def new_profile(self):
+        """新建方案：路径沿用当前方案，并复制当前方案的缓存，之后可再修改路径"""
+        name = simpledialog.askstring(self.ui_text["new_profile"], self.ui_text["ask_profile_name"], parent=self.root)
+        name = (name or "").strip()
+        if not name: return
+        if name in self.profiles:
+            messagebox.showerror(self.ui_text["msg_error"], self.ui_text["msg_profile_exists"].format(name))
+            return
+        import shutil
+        self.meta_cache.save()
+        src, dst = self.profile_dir, profile_cache_dir(self.app_dir, name)
+        try:
+            os.makedirs(dst, exist_ok=True)
+            for fn in (META_CACHE_FILE, FILE_CACHE_FILE, HASH_CACHE_FILE, LAST_ORDER_FILE):
+                if os.path.exists(os.path.join(src, fn)):
+                    shutil.copyfile(os.path.join(src, fn), os.path.join(dst, fn))
+        except OSError as e:
+            print(f"Profile cache not copied: {e}")
+        self.profiles[name] = {"config_path": self.config_path.get(), "mod_root_path": self.mod_root_path.get()}
+        self.save_app_config()
+        if not self.switch_profile(name):
+            self._update_profile_box()
+
+    def delete_profile(self):
+        name = self.profile
+        if name == DEFAULT_PROFILE: return
+        if not messagebox.askyesno(self.ui_text["msg_confirm"], self.ui_text["msg_profile_delete"].format(name)):
+            return
+        if not self.switch_profile(DEFAULT_PROFILE):
+            return
+        import shutil
+        del self.profiles[name]
+        self.save_app_config()
+        self._update_profile_box()
+        shutil.rmtree(profile_cache_dir(self.app_dir, name), ignore_errors=True)
+
+    def browse_config(self):
+        f = filedialog.askopenfilename(filetypes=[("INI/TXT", "*.ini *.txt")])
+        if f:
+            self.config_path.set(f)
+            self.save_app_config()
+
+    def browse_mod_dir(self):
+        d = filedialog.askdirectory()
+        if d:
+            self.mod_root_path.set(d)
+            self.save_app_config()
+
+    # ================= Core Logic =================
+
+    def load_data(self, silent=False):
+        # 扫描进行中再次点击按钮 = 取消
+        if self.scan is not None:
+            self.cancel_scan()
+            return
+
+        cp = self.config_path.get()
+        mp = self.mod_root_path.get()
+        
+        if not os.path.exists(cp) or not os.path.exists(mp):
+            if not silent: messagebox.showerror(self.ui_text["msg_error"], self.ui_text["msg_path_err"])
+            return
+
+        # 工坊根目录只扫描一次，得到所有模组文件夹的 stat
+        TRACE.start_op("load_data")  # 在 _finish_scan 中结束
+        try:
+            with TRACE.span("index_workshop"):
+                root_index = index_workshop(mp)
+        except OSError as e:
+            TRACE.finish_op()
+            if not silent: messagebox.showerror(self.ui_text["msg_error"], str(e))
+            return
+        # Steam 清单：文件未变化时复用上次的索引
+        with TRACE.span("manifest"):
+            self.manifest = read_manifest(manifest_path(mp), self.manifest)
+
+        issues = []
+        sig = file_signature(cp)  # 读取之前取签名，读取期间的外部修改之后仍能发现
+        try:
+            mods = read_load_order(cp, issues)
+        except Exception as e:
+            TRACE.finish_op()
+            if not silent: messagebox.showerror("Error", str(e))
+            return
+        for no, text in issues:
+            print(f"usersettings.ini:{no}: {text}")
+        self._load_issues = len(issues)
+
+        if mods is None:
+            TRACE.finish_op()
+            return
+        self._stop_watcher()
+
+        # mod_id 用作 Treeview 行 iid，重复项只保留第一次出现
+        for mid in self.model.set_mods(mods):
+            print(f"Duplicate mod in LoadOrder ignored: {mid}")
+        # 与磁盘一致的基准取自刚读到的内容，扫描期间的开关/拖动算作未保存的改动
+        self._mark_saved(sig)
+        self.totals.reset(self.model)
+        self._update_totals()
+
+        # 加载详情：后台线程池并行读取各模组 (未变化的模组直接命中缓存)。
+        # 元数据缓存中已有的模组先按缓存立即显示，扫描完成的行再原地更新；完全没有缓存时逐行插入
+        self.meta_cache.open(mp)
+        self.meta_cache.reset_stats()
+        with TRACE.span("prefill"):
+            self._scan_prefilled = sum(self.meta_cache.peek(m) for m in self.model) > 0
+        self.view = self.model  # 扫描期间不筛选，结束后 refresh_list 再应用
+        self._virtual = len(self.model) > self.virtual_threshold
+        if not self._scan_prefilled:
+            self.tree.delete(*self.tree.get_children())
+            self._row_cache.clear()
+            self._view_offset = 0
+        elif self._virtual:
+            self._render_window()
+        else:
+            self._sync_rows(self.model)
+        self._scan_rows = []
+        self._scan_silent = silent
+        self.scan = WorkshopScan(list(self.model), mp, self.meta_cache, self.scan_workers, root_index, self.manifest)
+
+        self.tree.locked = True
+        self.btn_load.config(text=self.ui_text["cancel_scan"])
+        self.progress.config(maximum=max(1, self.scan.total), value=0)
+        self.progress.pack(side="left", padx=5, after=self.btn_save)
+        self.lbl_progress.pack(side="left", after=self.progress)
+        self._poll_scan()
+
+    def _poll_scan(self):
+        scan = self.scan
+        if scan is None:
+            return
+        done = scan.drain()
+        if self._scan_prefilled:
+            self._update_rows([scan.mods[idx] for idx in done])
+            done = ()
+        for idx in done:
+            if self._virtual:
+                continue  # 虚拟模式下扫描结束后再渲染可见窗口
+            pos = bisect.bisect(self._scan_rows, idx)
+            self._scan_rows.insert(pos, idx)
+            m = scan.mods[idx]
+            state = self._row_state(m)
+            self.tree.insert("", pos, iid=m.mod_id, values=state[0], tags=state[1])
+            self._row_cache[m.mod_id] = state
+
+        self.progress.config(value=scan.done)
+        self.lbl_progress.config(text=self.ui_text["scan_progress"].format(scan.done, scan.total))
+        if scan.finished:
+            self._finish_scan()
+        else:
+            self.root.after(SCAN_POLL_MS, self._poll_scan)
+
+    def cancel_scan(self, notify=True):
+        if self.scan is None:
+            return
+        self.scan.cancel()
+        self._finish_scan(cancelled=True, notify=notify)
+
+    def _finish_scan(self, cancelled=False, notify=True):
+        scan = self.scan
+        self.scan = None
+        self._scan_rows = []
+        self.tree.locked = False
+        self.progress.pack_forget()
+        self.lbl_progress.pack_forget()
+        self.btn_load.config(text=self.ui_text["load_refresh"])
+
+        cache = self.meta_cache
+        evicted = cache.prune(self.model.order)
+        cache.save()
+        print(f"Meta cache: {cache.hits} hits, {cache.misses} misses, {evicted} evicted")
+        outdated = 0
+        if self.manifest is not None:
+            items = [self.manifest.get(m.mod_id) for m in self.model]
+            outdated = sum(1 for item in items if item is not None and item.outdated)
+            print(f"Workshop manifest: {len(self.manifest.items)} items, {len(cache.updated)} updated, {outdated} outdated")
+
+        # 取消时把未扫描完的模组也补进列表 (显示 ID)
+        self.search.sync(self.model)
+        self.totals.reset(self.model)
+        self.refresh_list()
+        self._start_watcher()
+        if self.watcher is not None and file_signature(self.config_path.get()) != self._config_sig:
+            self._watch_config = True  # 扫描期间 usersettings.ini 被外部修改，下次轮询时处理
+        self.measure_sizes()
+        TRACE.finish_op()
+        if STARTUP.enabled:
+            STARTUP.mark("load mod list")
+            STARTUP.report()
+        if cancelled:
+            if notify:
+                messagebox.showinfo(self.ui_text["msg_success"], self.ui_text["msg_scan_cancelled"].format(scan.done, scan.total))
+        elif not self._scan_silent:
+            msg = self.ui_text["msg_load_ok"].format(len(self.model))
+            msg += self.ui_text["msg_cache_stats"].format(cache.hits, cache.misses, evicted)
+            if self._load_issues:
+                msg += self.ui_text["msg_load_issues"].format(self._load_issues)
+            if cache.updated or outdated:
+                msg += self.ui_text["msg_manifest_stats"].format(len(cache.updated), outdated)
+            messagebox.showinfo(self.ui_text["msg_success"], msg)
+
+    # ---------- 目录监视 ----------
+
+    def _on_watch_toggle(self):
+        self.save_app_config()
+        if self.watch_var.get():
+            self._start_watcher()
+        else:
+            self._stop_watcher()
+
+    def _mark_saved(self, sig=None):
+        """
+        记录当前与磁盘一致的状态：之后 usersettings.ini 的变化若与此不同即为外部修改。
+        sig 为读取文件之前取得的签名，省略时取当前签名 (刚保存完)。
+        """
+        self._config_sig = sig if sig is not None else file_signature(self.config_path.get())
+        self._saved_order = self._order_snapshot()
+        save_last_order(os.path.join(self.profile_dir, LAST_ORDER_FILE), self.model)
+
+    def _order_snapshot(self):
+        return tuple((m.mod_id, m.enabled) for m in self.model)
+
+    def _start_watcher(self):
+        self._stop_watcher()
+        if not self.watch_var.get() or not len(self.model) or self.scan is not None:
+            return
+        try:
+            self.watcher = WorkshopWatcher(self.mod_root_path.get(), self.config_path.get(), self.model)
+        except OSError as e:
+            print(f"Watcher not started: {e}")
+            return
+        print(f"Watching workshop folder ({self.watcher.backend})")
+        self._watch_job = self.root.after(self.watcher.interval, self._poll_watcher)
+
+    def _stop_watcher(self):
+        if self._watch_job is not None:
+            self.root.after_cancel(self._watch_job)
+            self._watch_job = None
+        if self.watcher is not None:
+            self.watcher.close()
+            self.watcher = None
+        self._watch_pending.clear()
+        self._watch_config = False
+
+    def _poll_watcher(self):
+        """定时读取变化；最后一次变化后静默 WATCH_DEBOUNCE_MS 才统一刷新"""
+        self._watch_job = None
+        watcher = self.watcher
+        if watcher is None:
+            return
+        changed, config_changed = watcher.poll()
+        now = time.monotonic()
+        if changed or config_changed:
+            self._watch_pending |= changed
+            self._watch_config |= config_changed
+            self._watch_last = now
+        if (self._watch_pending or self._watch_config) and now - self._watch_last >= WATCH_DEBOUNCE_MS / 1000:
+            self._apply_watch_changes()
+        if self.watcher is watcher:
+            self._watch_job = self.root.after(watcher.interval, self._poll_watcher)
+
+    def _apply_watch_changes(self):
+        ids, config_changed = self._watch_pending, self._watch_config
+        self._watch_pending, self._watch_config = set(), False
+
+        # usersettings.ini 被外部修改 (忽略自己保存造成的变化)：重新读取整个列表
+        if config_changed and file_signature(self.config_path.get()) != self._config_sig:
+            if self._order_snapshot() == self._saved_order or \
+                    messagebox.askyesno(self.ui_text["msg_confirm"], self.ui_text["msg_config_changed"]):
+                self.load_data(silent=True)
+                return
+            self._config_sig = file_signature(self.config_path.get())
+
+        # 只重新读取变化的模组文件夹
+        mp = self.mod_root_path.get()
+        refreshed = [m for m in map(self.model.get, ids) if m is not None]
+        self.meta_cache.discard([m.mod_id for m in refreshed])  # 文件夹已变化，不按清单时间命中
+        self.manifest = read_manifest(manifest_path(mp), self.manifest)
+        for m in refreshed:
+            m.clear_info()
+            m.load_info(mp, self.meta_cache, manifest=self.manifest)
+            self.search.update(m)
+        if not refreshed:
+            return
+        self.meta_cache.save()
+        if self._filter_active():
+            self.refresh_list()  # 名字变化可能改变是否命中搜索
+        self._update_rows(refreshed)
+        if self._selected_id in ids and self._selected_id in self._row_cache:
+            self.show_details(None)
+        self.measure_sizes([m.mod_id for m in refreshed], stat_files=True)
+        print(f"Watcher: refreshed {len(refreshed)} mod(s)")
+
+    # ---------- 体积统计 ----------
+
+    def _update_totals(self):
+        t = self.totals
+        key = "size_pending" if self._sizes_pending else "size_totals"
+        self.lbl_totals.config(text=self.ui_text[key].format(
+            t.count, len(self.model), format_size(t.bytes), f"{t.files:,}"))
+
+    def _toggled(self, mods):
+        """开关状态改变后：合计增量更新，再刷新受影响的行"""
+        self.totals.toggled(mods)
+        self._update_totals()
+        if self.state_filter:
+            self.refresh_list()  # 按启用状态筛选时这些行会移出视图
+            return
+        self._update_rows(mods)
+
+    def measure_sizes(self, mod_ids=None, stat_files=False):
+        """
+        后台统计模组体积 (文件列表与冲突分析、查重共用 ModFileCache.json)；mod_ids 为 None 时统计全部。
+        目录 mtime 未变时直接沿用缓存的文件列表；stat_files 为 True 时逐个 stat 文件 (右键重新统计、目录监视)。
+        """
+        mp = self.mod_root_path.get()
+        ids = list(self.model.order) if mod_ids is None else list(mod_ids)
+        if not ids: return
+        cache = self.file_cache
+        workers = self.scan_workers
+        full = mod_ids is None
+        cancel = self._cancel
+
+        def job():
+            cache.open(mp)
+            sizes = measure_mods(ids, mp, cache, workers, cancel, stat_files)
+            if full:
+                cache.prune(index_workshop(mp))
+            cache.save()
+            return sizes
+
+        self._sizing += 1
+        batch = self._sizing
+        self._sizes_pending = True
+        self._update_totals()
+        profile = self.profile
+        self._run_background(job, lambda sizes, error: self._on_sizes_done(batch, profile, ids, sizes, error))
+
+    def _on_sizes_done(self, batch, profile, ids, sizes, error):
+        if batch == self._sizing:
+            self._sizes_pending = False
+        if profile != self.profile:
+            return  # 期间切换了配置方案
+        if error is not None:
+            print(f"Size scan failed: {error}")
+            self._update_totals()
+            return
+        # 过期批次的数据本身仍然正确，照常写入；文件夹已不存在的模组清除体积
+        self.totals.set_sizes(self.model, {mid: sizes.get(mid) for mid in ids})
+        self._update_totals()
+        self._update_rows([m for m in map(self.model.get, ids) if m is not None])
+        if self._selected_id in sizes and self._selected_id in self._row_cache:
+            self.show_details(None)
+
+    def _row_mod(self, item):
+        """Treeview 行 iid 即 mod_id，直接查模型"""
+        return self.model.get(item)
+
+    def _row_state(self, m):
+        """行的 (values, tags)"""
+        s = self.ui_text["status_on"] if m.enabled else self.ui_text["status_off"]
+        tags = ("dup",) if m.mod_id in self.dup_notes else ()
+        item = self.manifest.get(m.mod_id) if self.manifest is not None else None
+        if item is not None and item.outdated:
+            tags += ("outdated",)
+        size = self.totals.sizes.get(m.mod_id)
+        return (s, m.get_display_name(self.current_lang), m.mod_id, format_size(size.bytes) if size else ""), tags
+
+    def _update_rows(self, mods):
+        """只更新已创建且内容有变化的行 (虚拟模式下窗口外的行跳过)"""
+        cache = self._row_cache
+        for m in mods:
+            old = cache.get(m.mod_id)
+            if old is None:
+                continue
+            state = self._row_state(m)
+            if state != old:
+                self.tree.item(m.mod_id, values=state[0], tags=state[1])
+                cache[m.mod_id] = state
+
+    @TRACE.wrap("refresh_list", op=True)
+    def refresh_list(self):
+        """
+        增量刷新 Treeview：以 mod_id 作为行 iid，只更新内容变化的行，
+        顺序变化时一次 set_children 重排，滚动位置与选中项得以保留。
+        """
+        if self.scan is not None:
+            return  # 扫描中由 _poll_scan 逐行插入，结束后统一刷新
+        self.view = self._filtered_view()
+        self._virtual = len(self.view) > self.virtual_threshold
+        if self._virtual:
+            self._render_window()
+        else:
+            self._sync_rows(self.view)
+            self._on_tree_yscroll(*self.tree.yview())
+
+    # ---------- 搜索与筛选 ----------
+
+    def _filter_active(self):
+        return bool(self.search_var.get().strip()) or self.state_filter != 0
+
+    def _filtered_view(self):
+        """按搜索词与启用状态筛选模型；无筛选时直接返回模型"""
+        hits = self.search.search(self.search_var.get())
+        state = self.state_filter
+        if hits is None and state == 0:
+            return self.model
+        want = state == 1
+        return ModListView([m for m in self.model
+                            if (hits is None or m.mod_id in hits) and (state == 0 or m.enabled == want)])
+
+    def _schedule_filter(self):
+        """输入时合并到空闲时刷新一次，连续按键不会重复重建列表"""
+        if self._filter_job is None:
+            self._filter_job = self.root.after_idle(self._apply_filter)
+
+    def _apply_filter(self):
+        self._filter_job = None
+        self._view_offset = 0
+        self.refresh_list()
+
+    def _on_state_filter(self, event):
+        self.state_filter = self.cb_state.current()
+        self._schedule_filter()
+
+    @TRACE.wrap("_sync_rows")
+    def _sync_rows(self, mods):
+        """让 Treeview 的行恰好是 mods (按顺序)，只改动有差异的部分"""
+        tree = self.tree
+        cache = self._row_cache
+        want_ids = [m.mod_id for m in mods]
+        want = set(want_ids)
+        stale = [iid for iid in cache if iid not in want]
+        if stale:
+            tree.delete(*stale)
+            for iid in stale:
+                del cache[iid]
+
+        for m in mods:
+            state = self._row_state(m)
+            old = cache.get(m.mod_id)
+            if old is None:
+                tree.insert("", "end", iid=m.mod_id, values=state[0], tags=state[1])
+            elif old != state:
+                tree.item(m.mod_id, values=state[0], tags=state[1])
+            else:
+                continue
+            cache[m.mod_id] = state
+
+        if list(tree.get_children()) != want_ids:
+            tree.set_children("", *want_ids)
+
+    # ---------- 虚拟列表模式 ----------
+
+    def _window_size(self):
+        row_h = max(1, int(self.font_size.get() * 2.5))
+        h = self.tree.winfo_height()
+        if h <= 1:
+            return 50  # 窗口尚未布局
+        return max(1, h // row_h - 1)  # 去掉表头一行
+
+    def _render_window(self):
+        n = len(self.view)
+        size = self._window_size()
+        self._view_offset = max(0, min(self._view_offset, n - size))
+        rows = self.view.slice(self._view_offset, self._view_offset + size)
+        self._sync_rows(rows)
+        visible = [mid for mid in self._selection if mid in self._row_cache]
+        if set(visible) != set(self.tree.selection()):
+            self.tree.selection_set(visible)
+        if n:
+            self.scrollbar.set(self._view_offset / n, (self._view_offset + len(rows)) / n)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _scroll_window(self, delta):
+        old = self._view_offset
+        self._view_offset = max(0, self._view_offset + delta)
+        self._render_window()
+        return self._view_offset != old
+
+    def _on_tree_yscroll(self, first, last):
+        if not self._virtual:
+            self.scrollbar.set(first, last)
+
+    def _on_scrollbar(self, *args):
+        if not self._virtual:
+            return self.tree.yview(*args)
+        if args[0] == "moveto":
+            self._view_offset = int(float(args[1]) * len(self.view))
+            self._render_window()
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= self._window_size()
+            self._scroll_window(step)
+
+    def _on_drag_scroll(self, rows):
+        """拖拽到边缘时的自动滚动：虚拟模式下移动窗口，否则滚动控件"""
+        if self._virtual:
+            self._scroll_window(rows)
+        else:
+            self.tree.yview_scroll(rows, "units")
+
+    def _on_wheel(self, event):
+        if not self._virtual:
+            return None
+        if event.num == 4:
+            delta = -3
+        elif event.num == 5:
+            delta = 3
+        else:
+            delta = -3 if event.delta > 0 else 3
+        self._scroll_window(delta)
+        return "break"
+
+    def _on_key_scroll(self, event):
+        """虚拟模式下在窗口边缘按方向键/翻页键时移动窗口"""
+        if not self._virtual:
+            return None
+        sel = self.tree.selection()
+        children = self.tree.get_children()
+        if not sel or not children:
+            return None
+        size = self._window_size()
+        if event.keysym in ("Prior", "Next"):
+            self._scroll_window(-size if event.keysym == "Prior" else size)
+            return "break"
+        if event.keysym == "Up" and sel[0] == children[0]:
+            step = -1
+        elif event.keysym == "Down" and sel[0] == children[-1]:
+            step = 1
+        else:
+            return None
+        idx = self.view.index(sel[0]) + step
+        if 0 <= idx < len(self.view) and self._scroll_window(step):
+            self._selected_id = self.view.order[idx]
+            self.tree.selection_set(self._selected_id)
+        return "break"
+
+    def _on_tree_move(self, src_items, dst_item, after):
+        """
+        拖拽完成：先更新模型，再让 Treeview 增量跟随。
+        拖动的行 (可不连续) 合成一段，放在目标行之前或之后 (由松开时指针在行的上/下半部决定)。
+        """
+        model = self.model
+        dst = model.index(dst_item) + (1 if after else 0)
+        pos = dst - sum(1 for mid in src_items if model.index(mid) < dst)
+        self._move_block(src_items, pos)
+
+    def _move_block(self, mod_ids, dst_index):
+        if not self.model.move_block(mod_ids, dst_index):
+            return
+        self._selection = set(mod_ids)
+        self.refresh_list()
+        visible = [mid for mid in mod_ids if mid in self._row_cache]
+        if visible:
+            self.tree.selection_set(visible)
+            self.tree.see(visible[0])
+
+    def _selected_ids(self):
+        """选中的 mod_id (按列表顺序)；虚拟模式下包括滚出窗口的行"""
+        if self.scan is not None:
+            return []
+        if not self._virtual:
+            return list(self.tree.selection())
+        sel = self._selection
+        return [mid for mid in self.view.order if mid in sel]
+
+    def _on_tree_select(self, event):
+        """
+        记录选中集合后显示详情。
+        虚拟模式下重建窗口会删掉/重建行，控件选中项只剩窗口内的部分；
+        与已记录集合的可见部分一致时视为未变化，窗口外的选中项保留。
+        """
+        sel = set(self.tree.selection())
+        if not self._virtual:
+            self._selection = sel
+        elif sel != {mid for mid in self._selection if mid in self._row_cache}:
+            hidden = {mid for mid in self._selection if mid not in self._row_cache}
+            self._selection = sel | hidden if self.tree.extend_select else sel
+            self.tree.extend_select = False
+        self.show_details(event)
+
+    def _on_row_menu(self, event):
+        if self.scan is not None: return
+        r = self.tree.identify_row(event.y)
+        if not r: return
+        if r not in self.tree.selection():
+            self.tree.selection_set(r)
+        self.row_menu.tk_popup(event.x_root, event.y_root)
+
+    def move_selected(self, top):
+        ids = self._selected_ids()
+        if ids:
+            self._move_block(ids, 0 if top else len(self.model))
+
+    def toggle_selected(self):
+        """空格键：选中项中有未启用的则全部启用，否则全部禁用"""
+        ids = self._selected_ids()
+        if ids:
+            self.set_selected_enabled(not all(self.model.get(mid).enabled for mid in ids))
+
+    def set_selected_enabled(self, enabled):
+        changed = self.model.set_enabled(self._selected_ids(), enabled)
+        if changed:
+            self._toggled(changed)
+
+    def toggle_mod(self, event):
+        r = self.tree.identify_row(event.y)
+        if not r: return
+        self._toggled((self.model.toggle(r),))
+
+    @TRACE.wrap("show_details", op=True)
+    def show_details(self, event):
+        sel = self.tree.selection()
+        if not sel: return
+        m = self._row_mod(sel[0])
+        self._selected_id = sel[0]
+        
+        # 核心修改：获取对应语言的名字和简介
+        d_name, d_desc = m.get_display_info(self.current_lang)
+        if not d_desc:
+            d_desc = self.ui_text["fallback_desc"]
+        if m.mod_id in self.dup_notes:
+            d_desc = self.dup_notes[m.mod_id] + "\n\n" + d_desc
+
+        self.lbl_mod_name.config(text=d_name)
+        self.lbl_mod_size.config(text=self._size_text(m))
+        self.txt_desc.delete(1.0, "end")
+        self.txt_desc.insert("end", d_desc)
+        
+        # 图片走缩略图缓存，并预读相邻行
+        if m.image_path:
+            try:
+                ti = self.thumbs.get(m.image_path)
+                self.img_label.config(image=ti, text="")
+                self.img_label.image = ti
+            except Exception:
+                self.img_label.config(image="", text="Img Error")
+        else:
+            self.img_label.config(image="", text=self.ui_text["no_image"])
+        self._prefetch_neighbours(sel[0])
+
+    def _size_text(self, m):
+        """体积统计，以及 Steam 清单中的更新时间与安装体积"""
+        l = self.ui_text
+        lines = []
+        size = self.totals.sizes.get(m.mod_id)
+        if size is not None:
+            kinds = [f"{l['asset_kinds'][k]} {format_size(size.kinds[k])}" for k in ASSET_KIND_ORDER if size.kinds.get(k)]
+            lines.append(l["size_detail"].format(format_size(size.bytes), f"{size.files:,}"))
+            lines.append(" · ".join(kinds))
+        item = self.manifest.get(m.mod_id) if self.manifest is not None else None
+        if item is not None:
+            updated = time.strftime("%Y-%m-%d", time.localtime(item.updated)) if item.updated else "?"
+            text = l["steam_detail"].format(updated, format_size(item.size))
+            lines.append(text + l["steam_outdated"] if item.outdated else text)
+        return "\n".join(lines)
+
+    def _prefetch_neighbours(self, item):
+        paths = []
+        for step in (self.tree.next, self.tree.prev):
+            it = item
+            for _ in range(THUMB_PREFETCH_RADIUS):
+                it = step(it)
+                if not it: break
+                m = self._row_mod(it)
+                if m.image_path: paths.append(m.image_path)
+        self.thumbs.prefetch(paths)
+
+    @TRACE.wrap("save_game_config", op=True)
+    def save_game_config(self):
+        if not len(self.model) or self.scan is not None: return
+        
+        # 只改写 [LoadOrder]，未变化时不写文件；保存前做一份时间戳备份
+        writer = LoadOrderWriter(self.config_path.get(), self.backup_count)
+        try:
+            if not writer.prepare(self.model):
+                messagebox.showinfo(self.ui_text["msg_success"], self.ui_text["msg_unchanged"])
+                return
+            try:
+                writer.backup()
+            except OSError as e:
+                if not messagebox.askyesno(self.ui_text["msg_error"], self.ui_text["msg_backup_fail"].format(e)):
+                    return
+            writer.commit()
+        except (OSError, ValueError) as e:
+            messagebox.showerror(self.ui_text["msg_error"], str(e))
+            return
+
+        self._mark_saved()
+        backup = os.path.basename(writer.backup_path) if writer.backup_path else "-"
+        messagebox.showinfo(self.ui_text["msg_success"], self.ui_text["msg_saved"].format(backup))
+
+    def save_preset(self):
+        if self.scan is not None: return
+        if not os.path.exists(self.preset_root): os.makedirs(self.preset_root)
+        fn = filedialog.asksaveasfilename(initialdir=self.preset_root, filetypes=[("JSON", "*.json")], defaultextension=".json")
+        if not fn: return
+        
+        # 直接按模型顺序导出，无需遍历 Treeview
+        data = preset_data(self.model)
+        
+        with open(fn, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4, ensure_ascii=False)
+        messagebox.showinfo(self.ui_text["msg_success"], self.ui_text["msg_preset_saved"])
+
+    def load_preset(self):
+        if self.scan is not None: return
+        if not os.path.exists(self.preset_root): os.makedirs(self.preset_root)
+        PresetDialog(self)
+
+    # ---------- 调试跟踪 (--trace) ----------
+
+    def _on_trace_op(self, op):
+        """状态栏显示最近一次操作：总耗时、耗时最多的几个区段 (后台线程为累计值) 与计数器"""
+        parts = [f"{op.name} {op.elapsed * 1000:.0f} ms"]
+        spans = sorted(op.spans.items(), key=lambda kv: -kv[1][1])[:TRACE_STATUS_SPANS]
+        if spans:
+            parts.append(" · ".join(f"{name}×{n} {t * 1000:.0f} ms" for name, (n, t) in spans))
+        if op.counts:
+            parts.append(" · ".join(f"{k} {v}" for k, v in sorted(op.counts.items())))
+        self.lbl_trace.config(text="  |  ".join(parts))
+
+    def dump_trace(self):
+        path = os.path.join(self.app_dir, time.strftime("ModManagerTrace-%Y%m%d-%H%M%S.json"))
+        try:
+            n = TRACE.dump(path)
+        except OSError as e:
+            messagebox.showerror(self.ui_text["msg_error"], str(e))
+            return
+        print(f"Trace: {n} events written to {path}")
+        messagebox.showinfo(self.ui_text["msg_success"], self.ui_text["msg_trace_saved"].format(path))
+
+    # ---------- 后台任务 ----------
+
+    def _run_background(self, fn, on_done):
+        """在后台线程执行 fn()，完成后在主线程调用 on_done(结果, 异常)"""
+        if self._jobs is None:
+            self._jobs = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ModJob")
+        fut = self._jobs.submit(fn)
+
+        def poll():
+            if not fut.done():
+                self.root.after(SCAN_POLL_MS, poll)
+                return
+            try:
+                result, error = fut.result(), None
+            except Exception as e:
+                result, error = None, e
+            on_done(result, error)
+        self.root.after(SCAN_POLL_MS, poll)
+
+    def check_conflicts(self):
+        """后台遍历各模组文件树 (命中 ModFileCache.json 的不再遍历)，完成后显示冲突报告"""
+        if self.scan is not None or not len(self.model) or self._analyzing: return
+        mp = self.mod_root_path.get()
+        snapshot = ModListModel(list(self.model))  # 后台线程只读快照，不受拖拽影响
+        cache = self.file_cache
+        workers = self.scan_workers
+        cancel = self._cancel
+
+        def job():
+            cache.open(mp)
+            report = analyze_conflicts(snapshot, mp, cache, workers, cancel)
+            cache.prune(index_workshop(mp))  # 与查重共用缓存，保留所有模组文件夹
+            cache.save()
+            return report
+
+        self._analyzing = True
+        self.btn_conflicts.config(text=self.ui_text["conflict_running"], state="disabled")
+        self._run_background(job, self._on_conflicts_done)
+
+    def _on_conflicts_done(self, report, error):
+        self._analyzing = False
+        self.btn_conflicts.config(text=self.ui_text["check_conflicts"], state="normal")
+        if error is not None:
+            messagebox.showerror(self.ui_text["msg_error"], str(error))
+            return
+        ConflictDialog(self, report)
+
+    def check_duplicates(self):
+        """后台对创意工坊目录下所有模组计算内容摘要 (进程池，命中 ModHashCache.json 的不再读取)"""
+        if self.scan is not None or self._hashing: return
+        mp = self.mod_root_path.get()
+        if not os.path.isdir(mp):
+            messagebox.showerror(self.ui_text["msg_error"], self.ui_text["msg_path_err"])
+            return
+        file_cache, hash_cache = self.file_cache, self.hash_cache
+        workers, processes = self.scan_workers, self.hash_workers
+        cancel = self._cancel
+
+        def job():
+            file_cache.open(mp)
+            hash_cache.open(mp)
+            report = scan_duplicates(mp, file_cache, hash_cache, workers, processes, cancel)
+            file_cache.save()
+            hash_cache.save()
+            return report
+
+        self._hashing = True
+        self.btn_dups.config(text=self.ui_text["dup_running"], state="disabled")
+        profile = self.profile
+        self._run_background(job, lambda report, error: self._on_duplicates_done(report, error, profile))
+
+    def _on_duplicates_done(self, report, error, profile):
+        self._hashing = False
+        l = self.ui_text
+        self.btn_dups.config(text=l["check_dups"], state="normal")
+        if profile != self.profile:
+            return  # 期间切换了配置方案，结果属于另一套目录
+        if error is not None:
+            messagebox.showerror(l["msg_error"], str(error))
+            return
+
+        def name(mid):
+            m = self.model.get(mid)
+            return f"{m.get_display_name(self.current_lang)} ({mid})" if m else mid
+
+        notes = {}
+        for group in report.groups:
+            for mid in group:
+                notes[mid] = l["dup_same"].format(", ".join(name(o) for o in group if o != mid))
+        for mid, outer in report.contained.items():
+            notes.setdefault(mid, l["dup_contained"].format(name(outer)))
+        self.dup_notes = notes
+        self._update_rows(self.model)
+
+        msg = l["dup_summary"].format(report.mod_count, report.hashed_files)
+        msg += l["dup_result"].format(len(report.groups), len(report.contained)) if notes else l["dup_none"]
+        messagebox.showinfo(l["msg_success"], msg)
+
+    def apply_order(self, report):
+        """按冲突报告中的依赖提示重新排序 (以当前顺序为基准重新计算)"""
+        if self.scan is not None: return
+        order, _ = report.suggested_order(self.model)
+        if self.model.set_order(order):
+            self.refresh_list()
+
+    def apply_preset_data(self, data, save=False):
+        """只把预设与当前列表的差异应用到模型，Treeview 经 refresh_list 增量跟随"""
+        if self.scan is not None: return
+        diff = diff_preset(self.model, data)  # 预览之后列表可能已被自动刷新，重新计算
+        if diff.changed:
+            self.totals.toggled(apply_preset_diff(self.model, diff))
+            self._update_totals()
+            self.refresh_list()
+        if save:
+            self.save_game_config()
+            if not diff.missing: return
+
+        msg = self.ui_text["msg_preset_loaded"] + "\n" + self.ui_text["preset_summary"].format(
+            len(diff.moves), len(diff.enable), len(diff.disable), len(diff.missing))
+        if diff.missing:
+            msg += self.ui_text["msg_preset_missing"] + "\n".join(diff.missing[:10])
+        messagebox.showinfo(self.ui_text["msg_success"], msg)
+
+def main(argv):
+    """启动图形界面；argv 为 sys.argv[1:]"""
+    STARTUP.enabled = "--profile-startup" in argv
+    if "--trace" in argv:
+        TRACE.enable()
+    root = tk.Tk()
+    STARTUP.mark("create tk root")
+    try:
+        from ctypes import windll
+        windll.shcore.SetProcessDpiAwareness(1) 
+    except: pass
+    app = ModManagerApp(root)
+    root.mainloop()
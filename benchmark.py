@@ -0,0 +1,738 @@
+"""
+微基准 / Micro-benchmarks
+
+scan:   对比旧版 load_info (os.path.exists + 两次 os.listdir) 与单次 os.scandir 索引
+        (以及 MetaCache 命中时) 在 100/1000/5000 个合成模组文件夹上的系统调用次数与耗时。
+memory: 对比旧版 ModItem (实例 __dict__ + 嵌套 meta_data 并常驻描述) 与 __slots__ 版本
+        在 1k/10k 个模组时每个模组占用的字节数与遍历耗时。
+suite:  生成合成工坊目录 (模组数、信息文件大小、图片尺寸、语言区块数可调) 与对应的
+        usersettings.ini，对读取、解析、列表刷新、详情图片与保存各环节计时，可输出 JSON 供回归对比。
+        没有显示器时列表刷新使用 StubTree (只计 refresh_list 自身的比对开销)。
+loadorder: 在大型 usersettings.ini 上对比旧版 configparser 读取与流式 read_load_order，
+        并检查两者对重复键 / 异常行的容错。
+
+用法 / Usage:
+    python benchmark.py
+    python benchmark.py scan --sizes 100 1000 --repeat 5
+    python benchmark.py memory --sizes 1000 10000
+    python benchmark.py suite --sizes 1000 --info-bytes 4096 --image 1280x720 --langs 4 --json results.json
+    python benchmark.py loadorder --sizes 1000 20000 --extra-keys 20000
+"""
+import argparse
+import builtins
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
+import zlib
+
+import ModManagerCore as mm
+
+gui = None  # ModManagerGui，只有 suite 模式需要 (会导入 tkinter)，在 run_suite 中导入
+
+INFO_TEMPLATE = """[General]
+Version=1.0
+
+[Language_CN]
+Name=合成模组 {i}
+Description=这是第 {i} 个用于基准测试的合成模组。
+
+[Language_EN]
+Name=Synthetic Mod {i}
+Description=Synthetic mod number {i} used for benchmarking.
+"""
+
+# ==========================================
+# 合成工坊目录
+# ==========================================
+
+def make_workshop(root, n):
+    """生成 n 个模组文件夹；每 10 个中有 1 个只有旧版 _info_en.txt，每 20 个有 1 个没有信息文件"""
+    ids = []
+    for i in range(n):
+        mid = str(3000000000 + i)
+        d = os.path.join(root, mid)
+        os.makedirs(os.path.join(d, "Data"))
+        with open(os.path.join(d, "preview.jpg"), "wb") as f:
+            f.write(b"\xff\xd8\xff\xd9")
+        for name in ("units.xml", "weapons.xml"):
+            with open(os.path.join(d, name), "w", encoding="utf-8") as f:
+                f.write("<root/>")
+        if i % 20 == 19:
+            pass
+        elif i % 10 == 9:
+            with open(os.path.join(d, "_info_en.txt"), "w", encoding="utf-8") as f:
+                f.write(INFO_TEMPLATE.format(i=i))
+        else:
+            with open(os.path.join(d, "_info.ini"), "w", encoding="utf-8") as f:
+                f.write(INFO_TEMPLATE.format(i=i))
+        ids.append(mid)
+    return ids
+
+# ==========================================
+# 旧版实现 (保留用于对比)
+# ==========================================
+
+class LegacyModItem:
+    """旧版 ModItem：实例 __dict__ + 每个模组一份 cn/en 嵌套字典，描述常驻内存"""
+    def __init__(self, mod_id, enabled=False):
+        self.mod_id = mod_id
+        self.enabled = enabled
+        self.image_path = None
+        self.meta_data = {
+            'cn': {'name': '', 'desc': ''},
+            'en': {'name': '', 'desc': ''}
+        }
+
+    def get_display_info(self, lang_code):
+        primary = lang_code
+        secondary = 'en' if lang_code == 'cn' else 'cn'
+        name = self.meta_data[primary]['name']
+        if not name:
+            name = self.meta_data[secondary]['name']
+        if not name:
+            name = self.mod_id
+        desc = self.meta_data[primary]['desc']
+        if not desc:
+            desc = self.meta_data[secondary]['desc']
+        return name, desc
+
+def legacy_load_info(mod, workshop_root_path):
+    mod_dir = os.path.join(workshop_root_path, mod.mod_id)
+    if not os.path.exists(mod_dir):
+        return
+
+    img_files = [f for f in os.listdir(mod_dir) if f.lower().endswith(('.jpg', '.jpeg', '.png'))]
+    if img_files:
+        mod.image_path = os.path.join(mod_dir, img_files[0])
+
+    info_file = os.path.join(mod_dir, "_info.ini")
+    if not os.path.exists(info_file):
+        for f in os.listdir(mod_dir):
+            if f.startswith("_info") and f.endswith(".txt"):
+                info_file = os.path.join(mod_dir, f)
+                break
+
+    if info_file and os.path.exists(info_file):
+        legacy_parse_info(mod, info_file)
+
+def legacy_parse_info(mod, file_path):
+    """旧版 readlines + 逐行 lower 的解析，只认 cn/en，结果放进嵌套字典"""
+    meta_data = {'cn': {'name': '', 'desc': ''}, 'en': {'name': '', 'desc': ''}}
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        lines = f.readlines()
+    cur_section = None
+    for line in lines:
+        line = line.strip()
+        lower_line = line.lower()
+        if lower_line.startswith('[language_cn]'):
+            cur_section = 'cn'
+        elif lower_line.startswith('[language_en]'):
+            cur_section = 'en'
+        elif line.startswith('[') and line.endswith(']'):
+            cur_section = None
+        if cur_section:
+            if line.startswith('Name='):
+                meta_data[cur_section]['name'] = line[5:].strip()
+            elif line.startswith('Description='):
+                meta_data[cur_section]['desc'] = line[12:].strip()
+    mod.meta_data = meta_data
+
+def legacy_read_load_order(config_path):
+    """旧版：configparser 解析整个文件，再对每个键做正则匹配、每个值 split 两次"""
+    import configparser, re
+    key_pat = re.compile(r'Mod(\d+)Directory', re.IGNORECASE)
+    parser = configparser.ConfigParser()
+    parser.optionxform = str
+    parser.read(config_path, encoding='utf-8')
+    if 'LoadOrder' not in parser:
+        return None
+    lo = parser['LoadOrder']
+    tmp = []
+    for k in lo.keys():
+        m = key_pat.match(k)
+        if m:
+            idx = int(m.group(1))
+            val = lo[k]
+            if ',' in val:
+                mid = val.split(',')[0].strip()
+                en = val.split(',')[1].strip().lower() == 'true'
+                tmp.append((idx, mm.ModItem(mid, en)))
+    tmp.sort(key=lambda x: x[0])
+    return [x[1] for x in tmp]
+
+def run_legacy(root, ids):
+    for mid in ids:
+        legacy_load_info(LegacyModItem(mid), root)
+
+def run_scandir(root, ids):
+    root_index = mm.index_workshop(root)
+    for mid in ids:
+        mm.ModItem(mid).load_info(root, None, root_index)
+
+def make_cached_runner(cache_path):
+    """返回使用已预热 MetaCache 的扫描函数 (即"读取/刷新"时无改动的情况)"""
+    cache = mm.MetaCache(cache_path)
+
+    def run_cached(root, ids):
+        cache.open(root)
+        root_index = mm.index_workshop(root)
+        for mid in ids:
+            mm.ModItem(mid).load_info(root, cache, root_index)
+    return run_cached
+
+# ==========================================
+# 系统调用计数
+# ==========================================
+
+class _CountingEntry:
+    """包装 os.DirEntry，统计 stat() 调用 (Windows 上由枚举结果提供，Linux 上为一次 stat)"""
+    def __init__(self, entry, counts):
+        self._entry = entry
+        self._counts = counts
+        self.name = entry.name
+        self.path = entry.path
+
+    def is_dir(self, **kw):
+        return self._entry.is_dir(**kw)
+
+    def stat(self, **kw):
+        self._counts["DirEntry.stat"] += 1
+        return self._entry.stat(**kw)
+
+class _CountingScandir:
+    def __init__(self, it, counts):
+        self._it = it
+        self._counts = counts
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._it.close()
+
+    def __iter__(self):
+        for e in self._it:
+            yield _CountingEntry(e, self._counts)
+
+class SyscallCounter:
+    """临时替换 os.stat / os.listdir / os.scandir / open 以统计调用次数"""
+    NAMES = ("stat", "listdir", "scandir", "DirEntry.stat", "open")
+
+    def __enter__(self):
+        self.counts = dict.fromkeys(self.NAMES, 0)
+        self._orig = (os.stat, os.listdir, os.scandir, builtins.open)
+        o_stat, o_listdir, o_scandir, o_open = self._orig
+        c = self.counts
+
+        def stat(*a, **kw):
+            c["stat"] += 1
+            return o_stat(*a, **kw)
+
+        def listdir(*a, **kw):
+            c["listdir"] += 1
+            return o_listdir(*a, **kw)
+
+        def scandir(*a, **kw):
+            c["scandir"] += 1
+            return _CountingScandir(o_scandir(*a, **kw), c)
+
+        def open_(*a, **kw):
+            c["open"] += 1
+            return o_open(*a, **kw)
+
+        os.stat, os.listdir, os.scandir, builtins.open = stat, listdir, scandir, open_
+        return self
+
+    def __exit__(self, *exc):
+        os.stat, os.listdir, os.scandir, builtins.open = self._orig
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+# ==========================================
+# 内存占用
+# ==========================================
+
+DESC_TEXT = "A fairly long workshop description that explains what the mod changes. " * 8
+
+def build_legacy(n):
+    mods = []
+    for i in range(n):
+        m = LegacyModItem(str(3000000000 + i), i % 2 == 0)
+        m.image_path = f"E:\\SteamLibrary\\steamapps\\workshop\\content\\1286220\\{3000000000 + i}\\preview.jpg"
+        m.meta_data['cn'] = {'name': f"合成模组 {i}", 'desc': DESC_TEXT + str(i)}
+        m.meta_data['en'] = {'name': f"Synthetic Mod {i}", 'desc': DESC_TEXT + str(i)}
+        mods.append(m)
+    return mods
+
+def build_slotted(n):
+    mods = []
+    for i in range(n):
+        mid = str(3000000000 + i)
+        m = mm.ModItem(mid, i % 2 == 0)
+        m.image_path = f"E:\\SteamLibrary\\steamapps\\workshop\\content\\1286220\\{mid}\\preview.jpg"
+        m.info_path = f"E:\\SteamLibrary\\steamapps\\workshop\\content\\1286220\\{mid}\\_info.ini"
+        m.set_names({'cn': f"合成模组 {i}", 'en': f"Synthetic Mod {i}"})
+        mods.append(m)
+    return mods
+
+def measure(build, n):
+    """返回 (每个模组的字节数, 遍历取名字的耗时秒)"""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    mods = build(n)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(st.size_diff for st in after.compare_to(before, "filename"))
+
+    name = (lambda m: m.get_display_info("en")[0]) if isinstance(mods[0], LegacyModItem) \
+        else (lambda m: m.get_display_name("en"))
+    t0 = time.perf_counter()
+    for m in mods:
+        name(m)
+    return size / n, time.perf_counter() - t0
+
+def run_memory(args):
+    sizes = args.sizes or [1000, 10000]
+    print(f"{'mods':>6} {'impl':<8} {'bytes/mod':>10} {'total KiB':>10} {'iter ms':>8}")
+    for n in sizes:
+        for label, build in (("legacy", build_legacy), ("slots", build_slotted)):
+            per_mod, dt = measure(build, n)
+            print(f"{n:>6} {label:<8} {per_mod:>10.0f} {per_mod * n / 1024:>10.0f} {dt * 1000:>8.2f}")
+    print("\n* legacy 常驻两种语言的描述；slots 版本的描述按需读取，存放在 DESC_STORE 中 (最多 256 个模组)。")
+    return 0
+
+# ==========================================
+# 综合基准 (suite)
+# ==========================================
+
+SUITE_LANGS = ("cn", "en", "ru", "de", "fr", "jp", "kr", "es")
+
+def make_png(width, height, seed=0):
+    """不依赖 PIL 生成 RGB PNG；像素为随机噪声，文件大小接近真实截图"""
+    rng = random.Random(seed)
+    row_len = width * 3
+    raw = b"".join(b"\0" + rng.randbytes(row_len) for _ in range(height))
+
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw, 1)) + chunk(b"IEND", b""))
+
+def make_info(i, langs, info_bytes):
+    """信息文件：[General] + langs 个 [Language_xx] 区块，描述补齐到总长约 info_bytes"""
+    head = ["[General]", "Version=1.0", ""]
+    pad = max(0, info_bytes // max(1, len(langs)) - 80)
+    filler = ("Synthetic description text for benchmarking. " * (pad // 46 + 1))[:pad]
+    for lang in langs:
+        head += [f"[Language_{lang.upper()}]", f"Name=Synthetic Mod {i} ({lang})",
+                 f"Description=Mod {i} {lang}. {filler}", ""]
+    return "\n".join(head)
+
+def make_synthetic(base, n, info_bytes=1024, image=(512, 512), langs=2):
+    """
+    在 base 下生成 workshop/content/1286220/<id>/ 与 usersettings.ini，返回 (工坊目录, 配置文件, ids)。
+    每 3 个模组中有 1 个禁用；image 为 None 时不生成预览图。
+    """
+    root = os.path.join(base, "workshop", "content", "1286220")
+    os.makedirs(root)
+    lang_codes = SUITE_LANGS[:max(1, langs)]
+    png = make_png(*image) if image else None
+    ids = []
+    for i in range(n):
+        mid = str(3000000000 + i)
+        d = os.path.join(root, mid)
+        os.makedirs(os.path.join(d, "Assets"))
+        with open(os.path.join(d, "_info.ini"), "w", encoding="utf-8") as f:
+            f.write(make_info(i, lang_codes, info_bytes))
+        if png:
+            with open(os.path.join(d, "preview.png"), "wb") as f:
+                f.write(png)
+        with open(os.path.join(d, "Assets", "units.ini"), "w", encoding="utf-8") as f:
+            f.write(f"[Unit]\nName=unit{i}\n")
+        ids.append(mid)
+
+    cfg = os.path.join(base, "usersettings.ini")
+    lines = ["[Graphics]", "Resolution = 1920x1080", "", "[LoadOrder]"]
+    lines += [f"Mod{k + 1}Directory = {mid},{k % 3 != 2}" for k, mid in enumerate(ids)]
+    lines += [f"NumberOfModFiles = {n}", "", "[Audio]", "Volume = 80", ""]
+    with open(cfg, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+    return root, cfg, ids
+
+def timed(fn, repeat, setup=None, items=None):
+    """运行 repeat 次 (每次之前调用 setup)，返回毫秒统计；items 为本项处理的对象数 (默认为模组数)"""
+    samples = []
+    for _ in range(max(1, repeat)):
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    r = {"best_ms": round(min(samples), 3), "median_ms": round(statistics.median(samples), 3),
+         "runs": len(samples)}
+    if items is not None:
+        r["items"] = items
+    return r
+
+class _Value:
+    """代替 tk 变量，只提供 get()"""
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+class StubTree:
+    """
+    没有显示器时代替 Treeview：只维护行顺序与内容。
+    计时只反映 refresh_list / _sync_rows 自身的比对开销，不含 Tk 绘制。
+    """
+    def __init__(self):
+        self.rows = {}
+        self.order = []
+
+    def get_children(self, item=""):
+        return tuple(self.order)
+
+    def insert(self, parent, index, iid=None, values=(), tags=()):
+        self.rows[iid] = (values, tags)
+        if index == "end":
+            self.order.append(iid)
+        else:
+            self.order.insert(index, iid)
+        return iid
+
+    def item(self, iid, values=None, tags=None):
+        self.rows[iid] = (values, tags)
+
+    def delete(self, *iids):
+        gone = set(iids)
+        for iid in iids:
+            del self.rows[iid]
+        self.order = [iid for iid in self.order if iid not in gone]
+
+    def set_children(self, parent, *iids):
+        self.order = list(iids)
+
+    def yview(self, *args):
+        return 0.0, 1.0
+
+    def winfo_height(self):
+        return 600
+
+    def selection(self):
+        return ()
+
+    def selection_set(self, *items):
+        pass
+
+class _StubScrollbar:
+    def set(self, first, last):
+        pass
+
+def open_tk(force_stub):
+    """有显示器时返回隐藏的 Tk 根窗口，否则返回 None"""
+    if force_stub:
+        return None
+    try:
+        root = gui.tk.Tk()
+    except gui.tk.TclError:
+        return None
+    root.withdraw()
+    return root
+
+def make_list_app(model, tk_root):
+    """
+    只带列表刷新所需状态的 ModManagerApp (不执行 __init__，不读取用户配置、不建完整界面)，
+    用于单独测量 refresh_list。
+    """
+    app = object.__new__(gui.ModManagerApp)
+    app.model = app.view = model
+    app.scan = None
+    app.search = gui.SearchIndex()
+    app.search.sync(model)
+    app.search_var = _Value("")
+    app.state_filter = 0
+    app.virtual_threshold = mm.DEFAULT_VIRTUAL_THRESHOLD
+    app._virtual = False
+    app._view_offset = 0
+    app._selected_id = None
+    app._row_cache = {}
+    app.current_lang = "en"
+    app.ui_text = mm.UI_LANG_DATA["en"]
+    app.dup_notes = {}
+    app.manifest = None
+    app.totals = mm.EnabledTotals()
+    app.font_size = _Value(10)
+    if tk_root is None:
+        app.tree, app.scrollbar = StubTree(), _StubScrollbar()
+    else:
+        app.tree = gui.ReorderableTreeview(tk_root, columns=("enabled", "name", "id", "size"), show="headings")
+        app.tree.pack()
+        app.scrollbar = gui.ttk.Scrollbar(tk_root)
+    return app
+
+def suite_case(base, n, args, tk_root):
+    """对一个合成工坊目录运行全部计时项，返回 {项目: 统计}"""
+    image = None if args.image == "0" else tuple(int(v) for v in args.image.lower().split("x"))
+    t0 = time.perf_counter()
+    root, cfg, ids = make_synthetic(base, n, args.info_bytes, image, args.langs)
+    results = {"generate": {"best_ms": round((time.perf_counter() - t0) * 1000, 3), "runs": 1}}
+    rep = args.repeat
+
+    # load_data 的读取路径：工坊根目录索引 + [LoadOrder] 解析 + 建模型
+    results["read_load_order"] = timed(lambda: mm.read_load_order(cfg), rep)
+
+    def load_data_parse():
+        mm.index_workshop(root)
+        mm.ModListModel(mm.read_load_order(cfg))
+    results["load_data_parse"] = timed(load_data_parse, rep)
+
+    # ModItem.load_info：无缓存 / MetaCache 命中
+    mods = mm.read_load_order(cfg)
+    results["load_info"] = timed(lambda: run_scandir(root, ids), rep)
+    cache = mm.MetaCache(os.path.join(base, mm.META_CACHE_FILE))
+    cache.open(root)
+    index = mm.index_workshop(root)
+    for m in mods:
+        m.load_info(root, cache, index)
+    results["load_info_cached"] = timed(
+        lambda: [mm.ModItem(mid).load_info(root, cache, index) for mid in ids], rep)
+
+    # _parse_info：只解析名字
+    info_paths = [m.info_path for m in mods if m.info_path]
+    probe = mm.ModItem("probe")
+    results["parse_info"] = timed(lambda: [probe._parse_info(p) for p in info_paths], rep)
+
+    # refresh_list：首次填充 / 无变化 / 移动一个模组 / 搜索
+    model = mm.ModListModel(mods)
+    app = make_list_app(model, tk_root)
+    flush = tk_root.update_idletasks if tk_root is not None else (lambda: None)
+    try:
+        app.search.wait()  # 描述索引在后台线程中建立，计时前先等它结束
+
+        def reset_rows():
+            app.tree.delete(*app.tree.get_children())
+            app._row_cache.clear()
+            flush()
+        results["refresh_list_fill"] = timed(lambda: (app.refresh_list(), flush()), rep, reset_rows)
+        results["refresh_list_noop"] = timed(lambda: (app.refresh_list(), flush()), rep)
+        results["refresh_list_move"] = timed(
+            lambda: (model.move_block([model.order[-1]], 0), app.refresh_list(), flush()), rep)
+        app.search_var.value = "mod 12"
+        results["refresh_list_search"] = timed(lambda: (app.refresh_list(), flush()), rep)
+        app.search_var.value = ""
+    finally:
+        app.search.close(wait=True)  # 之后的项目与删除临时目录都不能与后台线程重叠
+
+    # show_details：描述按需读取 + 缩略图 (需要 Pillow)
+    sample = [m for m in mods if m.info_path][:200]
+
+    def forget_descs():
+        for m in sample:
+            mm.DESC_STORE.forget(m.info_path)
+    results["show_details_desc"] = timed(lambda: [m.get_display_info("en") for m in sample], rep,
+                                         forget_descs, len(sample))
+    images = [m.image_path for m in mods if m.image_path][:50]
+    if not images:
+        results["show_details_image"] = {"skipped": "no images (--image 0)"}
+    elif not _has_pillow():
+        results["show_details_image"] = {"skipped": "Pillow not installed"}
+    else:
+        thumb_dir = os.path.join(base, mm.THUMB_DIR)
+        thumbs = gui.ThumbnailCache(thumb_dir, 64 << 20)
+        make = lambda: [thumbs._make_thumb(p, thumbs._key(p)) for p in images]
+        results["show_details_image"] = timed(make, rep, lambda: shutil.rmtree(thumb_dir, ignore_errors=True),
+                                              len(images))
+        results["show_details_image_disk"] = timed(make, rep, items=len(images))
+
+    # save_game_config：每次先改一个开关，保证确实需要写入
+    writer = mm.LoadOrderWriter(cfg, backup_count=3)
+    results["save_prepare"] = timed(lambda: writer.prepare(model), rep, lambda: model.toggle(model.order[0]))
+
+    def save():
+        writer.prepare(model)
+        writer.backup()
+        writer.commit()
+    results["save_game_config"] = timed(save, rep, lambda: model.toggle(model.order[0]))
+
+    for r in results.values():
+        if "best_ms" in r:
+            r["per_item_us"] = round(r["best_ms"] * 1000 / r.get("items", n), 3)
+    return results
+
+def _has_pillow():
+    import importlib.util
+    return importlib.util.find_spec("PIL") is not None
+
+def run_suite(args):
+    global gui
+    import ModManagerGui as gui
+    sizes = args.sizes or [1000]
+    tk_root = open_tk(args.stub_tk)
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "tree": "tk" if tk_root is not None else "stub",
+            "pillow": _has_pillow(),
+            "info_bytes": args.info_bytes,
+            "image": args.image,
+            "langs": args.langs,
+            "repeat": args.repeat,
+        },
+        "cases": {},
+    }
+    try:
+        for n in sizes:
+            base = tempfile.mkdtemp(prefix="sp_suite_")
+            try:
+                report["cases"][str(n)] = suite_case(base, n, args, tk_root)
+            finally:
+                shutil.rmtree(base, ignore_errors=True)
+    finally:
+        if tk_root is not None:
+            tk_root.destroy()
+
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        return 0
+    print(f"tree={report['meta']['tree']} pillow={report['meta']['pillow']} repeat={args.repeat}")
+    print(f"{'mods':>6} {'stage':<24} {'best ms':>10} {'median ms':>10} {'us/item':>9}")
+    for n, results in report["cases"].items():
+        for name, r in results.items():
+            if "skipped" in r:
+                print(f"{n:>6} {name:<24} {'skipped: ' + r['skipped']:>31}")
+            else:
+                print(f"{n:>6} {name:<24} {r['best_ms']:>10.2f} {r.get('median_ms', r['best_ms']):>10.2f} "
+                      f"{r['per_item_us']:>9.2f}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.json}")
+    return 0
+
+# ==========================================
+# LoadOrder 读取 (loadorder)
+# ==========================================
+
+def make_settings(path, n, extra_keys, broken=False):
+    """
+    生成 usersettings.ini：[LoadOrder] 前后各有若干其他区块，共 extra_keys 个无关键值。
+    broken 时再加入游戏偶尔写出的重复键与无分隔符的行。
+    """
+    lines = []
+    per = max(1, extra_keys // 20)
+    for sec in range(10):
+        lines.append(f"[Section{sec}]")
+        lines += [f"Key{k} = value {sec}-{k}" for k in range(per)]
+        lines.append("")
+    lines.append("[LoadOrder]")
+    lines += [f"Mod{i + 1}Directory = {3000000000 + i},{i % 3 != 2}" for i in range(n)]
+    if broken:
+        lines.append(f"Mod1Directory = {3000000000},True")
+        lines.append("stray line without delimiter")
+    lines += [f"NumberOfModFiles = {n}", ""]
+    for sec in range(10, 20):
+        lines.append(f"[Section{sec}]")
+        lines += [f"Key{k} = value {sec}-{k}" for k in range(per)]
+        lines.append("")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+
+def run_loadorder(args):
+    sizes = args.sizes or [1000, 5000, 20000]
+    print(f"{'mods':>6} {'lines':>7} {'impl':<13} {'best ms':>9} {'median ms':>10}  broken file")
+    tmp = tempfile.mkdtemp(prefix="sp_lo_")
+    try:
+        for n in sizes:
+            path = os.path.join(tmp, "usersettings.ini")
+            bad = os.path.join(tmp, "broken.ini")
+            make_settings(path, n, args.extra_keys)
+            make_settings(bad, n, args.extra_keys, broken=True)
+            with open(path, encoding="utf-8") as f:
+                line_count = sum(1 for _ in f)
+            expect = [(m.mod_id, m.enabled) for m in legacy_read_load_order(path)]
+            for label, fn in (("configparser", legacy_read_load_order),
+                              ("streaming", lambda p: mm.read_load_order(p, []))):
+                got = [(m.mod_id, m.enabled) for m in fn(path)]
+                assert got == expect, f"{label} result differs"
+                r = timed(lambda: fn(path), args.repeat)
+                try:
+                    issues = []
+                    mods = fn(bad) if label == "configparser" else mm.read_load_order(bad, issues)
+                    tolerance = f"ok, {len(mods)} mods" + (f", {len(issues)} issue(s) reported" if issues else "")
+                except Exception as e:
+                    tolerance = f"{type(e).__name__}"
+                print(f"{n:>6} {line_count:>7} {label:<13} {r['best_ms']:>9.2f} {r['median_ms']:>10.2f}  {tolerance}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return 0
+
+# ==========================================
+# 主流程
+# ==========================================
+
+def bench(fn, root, ids, repeat):
+    with SyscallCounter() as sc:
+        fn(root, ids)
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(root, ids)
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return sc, best
+
+def run_scan(args):
+    args.sizes = args.sizes or [100, 1000, 5000]
+    print(f"{'mods':>6} {'impl':<8} {'calls':>7} {'calls/mod':>9} {'ms':>9} {'us/mod':>8}  breakdown")
+    for n in args.sizes:
+        tmp = tempfile.mkdtemp(prefix="sp_bench_")
+        try:
+            root = os.path.join(tmp, "1286220")
+            ids = make_workshop(root, n)
+            run_cached = make_cached_runner(os.path.join(tmp, mm.META_CACHE_FILE))
+            run_cached(root, ids)
+            for label, fn in (("legacy", run_legacy), ("scandir", run_scandir), ("cached", run_cached)):
+                sc, best = bench(fn, root, ids, args.repeat)
+                detail = ", ".join(f"{k}={v}" for k, v in sc.counts.items() if v)
+                print(f"{n:>6} {label:<8} {sc.total:>7} {sc.total / n:>9.2f} "
+                      f"{best * 1000:>9.1f} {best * 1e6 / n:>8.1f}  {detail}")
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+    print("\n* 计时为热缓存 (OS 页缓存已预热) 下多次运行的最快值；"
+          "网络盘/机械盘上每次系统调用的往返延迟会放大差异。")
+    return 0
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Mod manager micro-benchmarks")
+    ap.add_argument("mode", nargs="?", choices=("scan", "memory", "suite", "loadorder"), default="scan")
+    ap.add_argument("--sizes", type=int, nargs="+",
+                    help="模组数量 (scan 默认 100 1000 5000，memory 默认 1000 10000，suite 默认 1000，"
+                         "loadorder 默认 1000 5000 20000)")
+    ap.add_argument("--repeat", type=int, default=3, help="计时重复次数，取最快一次")
+    ap.add_argument("--info-bytes", type=int, default=1024, help="suite: 每个信息文件的大约字节数")
+    ap.add_argument("--image", default="512x512", help="suite: 预览图尺寸 WxH，0 为不生成")
+    ap.add_argument("--langs", type=int, default=2, help=f"suite: 语言区块数 (最多 {len(SUITE_LANGS)})")
+    ap.add_argument("--stub-tk", action="store_true", help="suite: 即使有显示器也使用 StubTree")
+    ap.add_argument("--json", help="suite: 结果写入该 JSON 文件，'-' 为只向标准输出打印 JSON")
+    ap.add_argument("--extra-keys", type=int, default=5000, help="loadorder: 其他区块中的键值数")
+    args = ap.parse_args(argv)
+    runner = {"scan": run_scan, "memory": run_memory, "suite": run_suite, "loadorder": run_loadorder}[args.mode]
+    return runner(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ModManagerCore as mm
+
+
+def mods(*pairs):
+    return [mm.ModItem(mid, en) for mid, en in pairs]
+
+
+class LoadOrderRoundTripTest(unittest.TestCase):
+    """usersettings.ini 的读取与改写必须对 BOM、CRLF 与非 UTF-8 字节保持一致"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "usersettings.ini")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, data):
+        with open(self.path, 'wb') as f:
+            f.write(data)
+
+    def read_bytes(self):
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+    def save(self, new_mods):
+        writer = mm.LoadOrderWriter(self.path, backup_count=0)
+        changed = writer.prepare(new_mods)
+        if changed:
+            writer.commit()
+        return changed
+
+    def order(self):
+        return [(m.mod_id, m.enabled) for m in mm.read_load_order(self.path, [])]
+
+    def test_parse_header_after_bom(self):
+        entries, issues = mm.parse_load_order(["\ufeff[LoadOrder]\n", "Mod1Directory = 111,True\n"])
+        self.assertEqual(entries, [(1, "111", True)])
+        self.assertEqual(issues, [])
+
+    def test_render_replaces_section_after_bom(self):
+        text = "\ufeff[LoadOrder]\nMod1Directory = 111,True\nNumberOfModFiles = 1\n"
+        out = mm.render_load_order(text, mods(("111", False)))
+        self.assertEqual(out, "\ufeff[LoadOrder]\nMod1Directory = 111,False\nNumberOfModFiles = 1\n")
+
+    def test_bom_file_round_trip(self):
+        self.write(b"\xef\xbb\xbf[LoadOrder]\r\nMod1Directory = 111,True\r\nMod2Directory = 222,True\r\n"
+                   b"NumberOfModFiles = 2\r\n")
+        self.assertTrue(self.save(mods(("222", True), ("111", False))))
+        data = self.read_bytes()
+        self.assertTrue(data.startswith(b"\xef\xbb\xbf[LoadOrder]\r\n"))
+        self.assertEqual(data.count(b"[LoadOrder]"), 1)
+        self.assertEqual(self.order(), [("222", True), ("111", False)])
+
+    def test_crlf_preserved(self):
+        self.write(b"[General]\r\nKey=1\r\n\r\n[LoadOrder]\r\nMod1Directory = 111,True\r\nNumberOfModFiles = 1\r\n")
+        self.save(mods(("111", True), ("222", False)))
+        data = self.read_bytes()
+        self.assertNotIn(b"\n", data.replace(b"\r\n", b""))
+        self.assertEqual(self.order(), [("111", True), ("222", False)])
+
+    def test_non_utf8_bytes_round_trip(self):
+        gbk = "D:\\游戏\\存档".encode('gbk')
+        self.write(b"[General]\nPath=" + gbk + b"\n\n[LoadOrder]\nMod1Directory = 111,True\nNumberOfModFiles = 1\n")
+        self.assertEqual(self.order(), [("111", True)])
+        self.save(mods(("111", False)))
+        data = self.read_bytes()
+        self.assertIn(b"Path=" + gbk + b"\n", data)
+        self.assertEqual(self.order(), [("111", False)])
+
+    def test_unchanged_is_not_written(self):
+        self.write(b"\xef\xbb\xbf[LoadOrder]\nMod1Directory = 111,True\nNumberOfModFiles = 1\n")
+        self.assertFalse(self.save(mods(("111", True))))
+
+
+if __name__ == "__main__":
+    unittest.main()